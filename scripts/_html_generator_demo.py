@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Demo for the HTML generator.
+
+Renders a report from a small sample analysis via the string API of
+generate_html(). Run html_generator.py directly to invoke it.
+"""
+
+try:
+    from scripts.html_generator import generate_html
+except ImportError:
+    from html_generator import generate_html
+
+
+sample_analysis = {
+    "stats": {
+        "total_commands": 150,
+        "unique_commands": 45,
+        "unique_utilities": 28,
+        "date_range": {"start": "2025-01-01", "end": "2025-02-05"},
+        "complexity_distribution": {"simple": 80, "intermediate": 50, "advanced": 20}
+    },
+    "commands": [
+        {
+            "base_command": "ls",
+            "full_command": "ls -la /home/user",
+            "category": "File Management",
+            "complexity": "simple",
+            "frequency": 25,
+            "description": "List directory contents with details",
+            "flags": [{"flag": "-l", "description": "Long format"}, {"flag": "-a", "description": "Show hidden files"}],
+            "is_new": False
+        },
+        {
+            "base_command": "grep",
+            "full_command": "grep -r 'pattern' ./src",
+            "category": "Text Processing",
+            "complexity": "intermediate",
+            "frequency": 18,
+            "description": "Search for patterns in files",
+            "flags": [{"flag": "-r", "description": "Recursive search"}],
+            "is_new": True,
+            "first_seen": "2025-01-15"
+        },
+        {
+            "base_command": "find",
+            "full_command": "find . -name '*.py' -exec grep 'import' {} +",
+            "category": "Search",
+            "complexity": "advanced",
+            "frequency": 8,
+            "description": "Find files and execute commands on them",
+            "flags": [{"flag": "-name", "description": "Match filename pattern"}, {"flag": "-exec", "description": "Execute command on results"}],
+            "is_new": True,
+            "first_seen": "2025-01-20"
+        }
+    ],
+    "categories": {
+        "File Management": ["ls", "cd", "mkdir", "cp", "mv"],
+        "Text Processing": ["grep", "sed", "awk", "cat"],
+        "Search": ["find", "locate"],
+        "Network": ["curl", "wget"]
+    }
+}
+
+sample_quizzes = [
+    {
+        "question": "What does the -l flag do in the 'ls' command?",
+        "options": ["List only files", "Long format with details", "List hidden files", "List in reverse order"],
+        "correct_answer": 1,
+        "explanation": "The -l flag displays files in long format, showing permissions, owner, size, and modification date."
+    },
+    {
+        "question": "Which command is used to search for text patterns in files?",
+        "options": ["find", "grep", "locate", "which"],
+        "correct_answer": 1,
+        "explanation": "grep (Global Regular Expression Print) searches for text patterns in files using regular expressions."
+    }
+]
+
+
+def main() -> None:
+    """Render the sample report and print its size."""
+    html_output = generate_html(sample_analysis, sample_quizzes)
+    print(f"Generated HTML length: {len(html_output)} characters")
+    print("HTML generation complete!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Shared base for the slotted record classes that replaced per-item dicts.
+"""
+
+from typing import Any, Iterator, Mapping, Tuple
+
+
+class FieldMapping(Mapping):
+    """
+    Read-only mapping over the fields of a slotted dataclass.
+
+    Lets a record stand in for the dict it replaced: [], in, get(), keys()
+    and items() see only the fields, never methods. Fields listed in
+    _optional_fields are left out of the mapping while empty, like a dict
+    that never had the key.
+    """
+    __slots__ = ()
+
+    _optional_fields: Tuple[str, ...] = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        value = getattr(self, key)
+        if not value and key in self._optional_fields:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        for name in self.__slots__:
+            if name not in self._optional_fields or getattr(self, name):
+                yield name
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
@@ -13,14 +13,15 @@ from typing import Dict, List, Set, Tuple, Any, Optional
 
 from knowledge_base import (
     COMMAND_TO_CATEGORY,
-    PIPE_OPERATORS,
-    REDIRECT_OPERATORS,
-    COMPOUND_OPERATORS,
-    SUBSHELL_MARKERS,
-    PROCESS_SUBSTITUTION,
+    OP_PIPE,
+    OP_REDIRECT,
+    OP_COMPOUND,
+    OP_SUBSHELL,
+    OP_PROCESS_SUB,
     LOOP_KEYWORDS,
     CONDITIONAL_KEYWORDS,
     LEARNING_ORDER,
+    classify_operators,
     get_category,
     get_all_categories,
 )
@@ -78,11 +79,12 @@ def parse_command(raw_cmd: str) -> ParsedCommand:
         return result
 
     # Check for various operators and constructs
-    result.has_pipe = any(op in raw_cmd for op in PIPE_OPERATORS)
-    result.has_redirect = any(op in raw_cmd for op in REDIRECT_OPERATORS)
-    result.has_compound = any(op in raw_cmd for op in COMPOUND_OPERATORS)
-    result.has_subshell = any(marker in raw_cmd for marker in SUBSHELL_MARKERS)
-    result.has_process_sub = any(marker in raw_cmd for marker in PROCESS_SUBSTITUTION)
+    op_classes = classify_operators(raw_cmd)
+    result.has_pipe = bool(op_classes & OP_PIPE)
+    result.has_redirect = bool(op_classes & OP_REDIRECT)
+    result.has_compound = bool(op_classes & OP_COMPOUND)
+    result.has_subshell = bool(op_classes & OP_SUBSHELL)
+    result.has_process_sub = bool(op_classes & OP_PROCESS_SUB)
 
     # Check for loops and conditionals
     words = set(re.findall(r'\b\w+\b', raw_cmd))
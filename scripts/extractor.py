@@ -9,7 +9,7 @@ import json
 import os
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterator, Optional
+from typing import Iterable, Iterator, Optional
 
 
 @dataclass
@@ -360,6 +360,25 @@ def extract_commands(entries: list[dict]) -> list[dict]:
     Returns:
         List of command dictionaries with 'command', 'description', 'output' keys
     """
+    _, tool_uses, tool_results = collect_tool_calls(entries)
+    return correlate_tool_calls(tool_uses, tool_results)
+
+
+def collect_tool_calls(entries: Iterable[dict]) -> tuple[int, dict[str, dict], dict[str, dict]]:
+    """
+    Collect bash tool_use and tool_result blocks without correlating them.
+
+    Sequence numbers are entry positions starting at 0. Collections from
+    several sources can be merged with dict.update() (after shifting the
+    sequence numbers) and correlated once, exactly as if all entries had
+    been collected in one pass.
+
+    Args:
+        entries: Parsed JSON entries from session files
+
+    Returns:
+        Tuple of (entry count, tool_uses, tool_results), both keyed by tool_use_id
+    """
     extractor = JSONLExtractor()
     tool_uses: dict[str, dict] = {}
     tool_results: dict[str, dict] = {}
@@ -369,7 +388,21 @@ def extract_commands(entries: list[dict]) -> list[dict]:
         extractor._process_entry(entry, tool_uses, tool_results, sequence_counter)
         sequence_counter += 1
 
-    extracted = extractor._correlate_commands(tool_uses, tool_results)
+    return sequence_counter, tool_uses, tool_results
+
+
+def correlate_tool_calls(tool_uses: dict[str, dict], tool_results: dict[str, dict]) -> list[dict]:
+    """
+    Correlate collected tool calls into pipeline command dicts.
+
+    Args:
+        tool_uses: Dict mapping tool_use_id to tool_use data
+        tool_results: Dict mapping tool_use_id to tool_result data
+
+    Returns:
+        List of command dictionaries, sorted by sequence number
+    """
+    extracted = JSONLExtractor()._correlate_commands(tool_uses, tool_results)
 
     # Convert ExtractedCommand objects to dicts for pipeline compatibility
     return [
@@ -3,52 +3,149 @@
 HTML Generator for Bash Learning Report
 
 Generates a single self-contained HTML file with all CSS and JS inline.
-No external dependencies - pure Python standard library.
+No external dependencies - pure Python standard library (orjson is used
+for embedding quiz data when it happens to be installed).
 """
 
-from typing import Any, List
+from collections import defaultdict
+from dataclasses import dataclass, field
+import functools
+from typing import Any, Callable, List, Mapping, NamedTuple, Sequence, TextIO
 from datetime import datetime
 from pathlib import Path
+from types import MappingProxyType
 import html
+import io
 import json
+import os
+import sys
 
 try:
-    from scripts.knowledge_base import COMMAND_DB, get_flags_for_command, get_command_info
+    import orjson
 except ImportError:
-    try:
-        from knowledge_base import COMMAND_DB, get_flags_for_command, get_command_info
-    except ImportError:
-        COMMAND_DB = {}
-        def get_flags_for_command(cmd): return {}
-        def get_command_info(cmd): return None
+    orjson = None
+
+try:
+    from scripts._records import FieldMapping
+except ImportError:
+    from _records import FieldMapping
+
 
+@functools.cache
+def _load_command_db() -> tuple[Mapping[str, dict], Callable[[str], dict]]:
+    """
+    Import the knowledge base on first use.
+
+    Importing this module stays cheap for callers that never render a report.
 
-def _generate_html_impl(analysis_result: dict[str, Any], quizzes: list[dict[str, Any]]) -> str:
+    Returns:
+        Tuple of (COMMAND_DB, get_flags_for_command); an empty database when
+        the knowledge base is unavailable
+    """
+    try:
+        from scripts.knowledge_base import COMMAND_DB, get_flags_for_command
+    except ImportError:
+        try:
+            from knowledge_base import COMMAND_DB, get_flags_for_command
+        except ImportError:
+            return {}, lambda cmd: {}
+    return COMMAND_DB, get_flags_for_command
+
+
+# CSS complexity labels indexed by complexity score (1-5)
+_COMPLEXITY_LABELS = ('simple', 'simple', 'simple', 'intermediate', 'advanced', 'advanced')
+
+# Shared default for missing sequences
+_EMPTY_TUPLE: tuple = ()
+
+# Shared fallback for commands missing from COMMAND_DB
+_EMPTY_INFO: Mapping[str, Any] = MappingProxyType({})
+
+# Inline-code lines skipped when picking a preview line for `python -c` etc.
+_CODE_IGNORE_PREFIXES = ('import ', 'from ', '#')
+
+
+@dataclass(slots=True, frozen=True)
+class FormattedFlag(FieldMapping):
+    """A flag used in a command, with its description."""
+    flag: str
+    description: str = ""
+
+
+@dataclass(slots=True, frozen=True)
+class FormattedCommand(FieldMapping):
+    """A command prepared for rendering in the HTML report."""
+    base_command: str
+    full_command: str
+    category: str
+    complexity: str
+    complexity_score: int
+    frequency: int
+    description: str
+    flags: list[FormattedFlag] = field(default_factory=list)
+    subcommand_desc: str = ""
+    common_patterns: list[str] = field(default_factory=list)
+    args: list[str] = field(default_factory=list)
+    is_new: bool = False
+    man_url: str = ""
+    use_cases: list[str] = field(default_factory=list)
+    gotchas: list[str] = field(default_factory=list)
+    related: list[str] = field(default_factory=list)
+    difficulty: str = ""
+
+
+class AnalysisView(NamedTuple):
+    """Read-only view of the analysis fields used to build the report."""
+    stats: Mapping[str, Any]
+    commands: list
+    top_commands: list
+    top_base_commands: list
+    operators_used: Mapping[str, int]
+
+
+def _analysis_view(analysis: dict, commands: List[dict]) -> AnalysisView:
+    """Extract the report fields from an analysis dict once, without copying."""
+    return AnalysisView(
+        stats=MappingProxyType(analysis.get('statistics', {})),
+        commands=analysis.get('commands', commands),
+        top_commands=analysis.get('top_commands', []),
+        top_base_commands=analysis.get('top_base_commands', []),
+        operators_used=MappingProxyType(analysis.get('operators_used', {})),
+    )
+
+
+def _generate_html_impl(
+    analysis_result: dict[str, Any],
+    quizzes: list[dict[str, Any]],
+    out: TextIO | None = None,
+) -> str | None:
     """
     Generate complete HTML report from analysis results and quizzes.
 
     Args:
         analysis_result: Dictionary containing parsed commands, stats, categories
         quizzes: List of quiz question dictionaries
+        out: Text stream to write the page to, section by section. When
+            omitted, the page is built in memory and returned.
 
     Returns:
-        Complete HTML string ready to write to file
+        Complete HTML string ready to write to file, or None when written to out
     """
     stats = analysis_result.get("stats", {})
     commands = analysis_result.get("commands", [])
     categories = analysis_result.get("categories", {})
 
-    overview_html = render_overview_tab(stats, commands, categories)
-    commands_html = render_commands_tab(commands)
-    lessons_html = render_lessons_tab(categories, commands)
-    quiz_html = render_quiz_tab(quizzes)
-
     inline_css = get_inline_css()
     inline_js = get_inline_js(quizzes)
 
     generation_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    return f'''<!DOCTYPE html>
+    # Each tab is rendered and written before the next one is built, so only
+    # one section is held in memory at a time when streaming to a file.
+    sink = io.StringIO() if out is None else out
+    write = sink.write
+
+    write(f'''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -96,19 +193,27 @@ def _generate_html_impl(analysis_result: dict[str, Any], quizzes: list[dict[str,
 
         <main class="content">
             <section id="panel-overview" class="panel active" role="tabpanel" aria-labelledby="tab-overview">
-{overview_html}
+''')
+    write(render_overview_tab(stats, commands, categories))
+    write('''
             </section>
 
             <section id="panel-commands" class="panel" role="tabpanel" aria-labelledby="tab-commands">
-{commands_html}
+''')
+    write(render_commands_tab(commands))
+    write('''
             </section>
 
             <section id="panel-lessons" class="panel" role="tabpanel" aria-labelledby="tab-lessons">
-{lessons_html}
+''')
+    write(render_lessons_tab(categories, commands))
+    write('''
             </section>
 
             <section id="panel-quiz" class="panel" role="tabpanel" aria-labelledby="tab-quiz">
-{quiz_html}
+''')
+    write(render_quiz_tab(quizzes))
+    write(f'''
             </section>
         </main>
 
@@ -121,7 +226,11 @@ def _generate_html_impl(analysis_result: dict[str, Any], quizzes: list[dict[str,
 {inline_js}
     </script>
 </body>
-</html>'''
+</html>''')
+
+    if out is None:
+        return sink.getvalue()
+    return None
 
 
 def _generate_operators_html(operators_used: dict, operator_descriptions: dict) -> str:
@@ -129,7 +238,7 @@ def _generate_operators_html(operators_used: dict, operator_descriptions: dict)
     if not operators_used:
         return '<p class="empty-state">No bash operators detected in these commands</p>'
 
-    operators_html = ""
+    operators_parts: list[str] = []
     # Sort by count descending
     sorted_ops = sorted(operators_used.items(), key=lambda x: -x[1])
     max_count = sorted_ops[0][1] if sorted_ops else 1
@@ -137,7 +246,7 @@ def _generate_operators_html(operators_used: dict, operator_descriptions: dict)
     for op, count in sorted_ops:
         name, desc = operator_descriptions.get(op, (op, 'Bash operator'))
         bar_width = (count / max_count) * 100
-        operators_html += f'''
+        operators_parts.append(f'''
                                 <div class="operator-item">
                                     <div class="operator-symbol"><code>{html.escape(op)}</code></div>
                                     <div class="operator-info">
@@ -148,8 +257,8 @@ def _generate_operators_html(operators_used: dict, operator_descriptions: dict)
                                         <div class="operator-bar" style="width: {bar_width}%"></div>
                                     </div>
                                     <div class="operator-count">{count}</div>
-                                </div>'''
-    return operators_html
+                                </div>''')
+    return ''.join(operators_parts)
 
 
 def render_overview_tab(stats: dict[str, Any], commands: list[dict], categories: dict) -> str:
@@ -173,18 +282,16 @@ def render_overview_tab(stats: dict[str, Any], commands: list[dict], categories:
     }
 
     # Top 10 commands by frequency - use pre-computed data if available
-    top_commands_data = stats.get("top_commands", [])
-    top_commands_html = ""
+    top_commands_data = _top_command_pairs(stats.get("top_commands", []))[:10]
+    top_commands_parts: list[str] = []
 
     if top_commands_data:
-        max_freq = top_commands_data[0].get("count", 1) if top_commands_data else 1
-        for item in top_commands_data[:10]:
-            cmd_str = item.get("command", "")
-            freq = item.get("count", 1)
+        max_freq = top_commands_data[0][1]
+        for cmd_str, freq in top_commands_data:
             bar_width = (freq / max_freq) * 100
             # Extract base command from full command
             cmd_name = html.escape(cmd_str.split()[0] if cmd_str else "unknown")
-            top_commands_html += f'''
+            top_commands_parts.append(f'''
                         <div class="top-command-item">
                             <div class="top-command-name">
                                 <code class="cmd">{cmd_name}</code>
@@ -193,7 +300,7 @@ def render_overview_tab(stats: dict[str, Any], commands: list[dict], categories:
                                 <div class="top-command-bar" style="width: {bar_width}%"></div>
                             </div>
                             <div class="top-command-count">{freq}</div>
-                        </div>'''
+                        </div>''')
     else:
         # Fallback to sorting commands by frequency
         sorted_commands = sorted(commands, key=lambda x: x.get("frequency", 0), reverse=True)[:10]
@@ -202,7 +309,7 @@ def render_overview_tab(stats: dict[str, Any], commands: list[dict], categories:
             freq = cmd.get("frequency", 0)
             bar_width = (freq / max_freq) * 100
             cmd_name = html.escape(cmd.get("base_command", "unknown"))
-            top_commands_html += f'''
+            top_commands_parts.append(f'''
                         <div class="top-command-item">
                             <div class="top-command-name">
                                 <code class="cmd">{cmd_name}</code>
@@ -211,52 +318,31 @@ def render_overview_tab(stats: dict[str, Any], commands: list[dict], categories:
                                 <div class="top-command-bar" style="width: {bar_width}%"></div>
                             </div>
                             <div class="top-command-count">{freq}</div>
-                        </div>'''
+                        </div>''')
+
+    top_commands_html = ''.join(top_commands_parts)
 
     # New commands (first appearances)
     new_commands = [c for c in commands if c.get("is_new", False)][:8]
-    new_commands_html = ""
+    new_commands_parts: list[str] = []
     for cmd in new_commands:
         cmd_name = html.escape(cmd.get("base_command", "unknown"))
         first_seen = cmd.get("first_seen", "")
-        new_commands_html += f'''
+        new_commands_parts.append(f'''
                         <div class="new-command-chip">
                             <code class="cmd">{cmd_name}</code>
                             <span class="first-seen">{first_seen}</span>
-                        </div>'''
+                        </div>''')
 
+    new_commands_html = ''.join(new_commands_parts)
     if not new_commands_html:
         new_commands_html = '<p class="empty-state">No new commands detected in this session</p>'
 
-    # Category breakdown for pie chart
-    category_data = []
-    cat_colors = [
-        "#4285f4", "#ea4335", "#fbbc05", "#34a853", "#ff6d01",
-        "#46bdc6", "#7baaf7", "#f07b72", "#fcd04f", "#81c995"
-    ]
+    # Category breakdown: SVG pie chart and legend
     sorted_cats = sorted(categories.items(), key=lambda x: len(x[1]), reverse=True)[:8]
-
-    for idx, (cat_name, cat_cmds) in enumerate(sorted_cats):
-        color = cat_colors[idx % len(cat_colors)]
-        count = len(cat_cmds)
-        category_data.append({
-            "name": cat_name,
-            "count": count,
-            "color": color
-        })
-
-    # Generate SVG pie chart
-    pie_svg = _generate_pie_chart(category_data)
-
-    # Category legend
-    category_legend = ""
-    for cat in category_data:
-        category_legend += f'''
-                        <div class="legend-item">
-                            <span class="legend-color" style="background: {cat['color']}"></span>
-                            <span class="legend-label">{html.escape(cat['name'])}</span>
-                            <span class="legend-count">{cat['count']}</span>
-                        </div>'''
+    pie_svg, category_legend = _render_category_breakdown(
+        tuple((cat_name, len(cat_cmds)) for cat_name, cat_cmds in sorted_cats)
+    )
 
     return f'''
                 <div class="dashboard">
@@ -317,6 +403,57 @@ def render_overview_tab(stats: dict[str, Any], commands: list[dict], categories:
                 </div>'''
 
 
+@functools.lru_cache(maxsize=32)
+def _render_category_breakdown(category_counts: tuple[tuple[str, int], ...]) -> tuple[str, str]:
+    """
+    Render the category pie chart and its legend.
+
+    Args:
+        category_counts: (category name, command count) pairs, largest first
+
+    Returns:
+        Tuple of (pie chart SVG, legend HTML)
+    """
+    cat_colors = [
+        "#4285f4", "#ea4335", "#fbbc05", "#34a853", "#ff6d01",
+        "#46bdc6", "#7baaf7", "#f07b72", "#fcd04f", "#81c995"
+    ]
+    category_data = []
+    for idx, (cat_name, count) in enumerate(category_counts):
+        color = cat_colors[idx % len(cat_colors)]
+        category_data.append({
+            "name": cat_name,
+            "count": count,
+            "color": color
+        })
+
+    # Generate SVG pie chart
+    pie_svg = _generate_pie_chart(category_data)
+
+    # Category legend
+    category_legend_parts: list[str] = []
+    for cat in category_data:
+        category_legend_parts.append(f'''
+                        <div class="legend-item">
+                            <span class="legend-color" style="background: {cat['color']}"></span>
+                            <span class="legend-label">{html.escape(cat['name'])}</span>
+                            <span class="legend-count">{cat['count']}</span>
+                        </div>''')
+    return pie_svg, ''.join(category_legend_parts)
+
+
+def _top_command_pairs(top_commands: Any) -> list[tuple[str, int]]:
+    """
+    Get (command, count) pairs from precomputed top commands.
+
+    Accepts parallel {'command': [...], 'count': [...]} lists as built by
+    generate_html_files, or a list of {'command', 'count'} dicts.
+    """
+    if isinstance(top_commands, Mapping):
+        return list(zip(top_commands.get("command", ()), top_commands.get("count", ())))
+    return [(item.get("command", ""), item.get("count", 1)) for item in top_commands]
+
+
 def _generate_pie_chart(category_data: list[dict]) -> str:
     """Generate an SVG pie chart."""
     if not category_data:
@@ -370,12 +507,16 @@ def render_commands_tab(commands: list[dict]) -> str:
     for cmd in commands:
         categories_set.add(cmd.get("category", "Other"))
 
-    category_chips = ""
-    for cat in sorted(categories_set):
-        category_chips += f'<button class="filter-chip" data-category="{html.escape(cat)}">{html.escape(cat)}</button>'
+    category_chips = ''.join(
+        f'<button class="filter-chip" data-category="{html.escape(cat)}">{html.escape(cat)}</button>'
+        for cat in sorted(categories_set)
+    )
 
-    # Generate command cards
-    commands_html = ""
+    # Generate command cards. Cards sharing a base command repeat the same
+    # flag and knowledge-base sections, so each distinct section is rendered once.
+    flags_cache: dict[tuple, str] = {}
+    kb_cache: dict[tuple, str] = {}
+    commands_parts: list[str] = []
     for idx, cmd in enumerate(commands):
         cmd_id = f"cmd-{idx}"
         base_cmd = html.escape(cmd.get("base_command", "unknown"))
@@ -390,17 +531,10 @@ def render_commands_tab(commands: list[dict]) -> str:
 
         # Flags breakdown with descriptions
         flags = cmd.get("flags", [])
-        flags_html = ""
-        if flags:
-            flags_html = '<div class="flags-section"><h5>Flags:</h5><ul class="flags-list">'
-            for flag in flags:
-                flag_name = html.escape(flag.get("flag", ""))
-                flag_desc = html.escape(flag.get("description", ""))
-                if flag_desc:
-                    flags_html += f'<li><code class="flag">{flag_name}</code> <span class="flag-desc">{flag_desc}</span></li>'
-                else:
-                    flags_html += f'<li><code class="flag">{flag_name}</code></li>'
-            flags_html += '</ul></div>'
+        flags_key = tuple((flag.get("flag", ""), flag.get("description", "")) for flag in flags)
+        flags_html = flags_cache.get(flags_key)
+        if flags_html is None:
+            flags_html = flags_cache[flags_key] = _render_flags_section(flags_key)
 
         # Subcommand description
         subcommand_desc = cmd.get("subcommand_desc", "")
@@ -408,15 +542,6 @@ def render_commands_tab(commands: list[dict]) -> str:
         if subcommand_desc:
             subcmd_html = f'<div class="subcmd-section"><span class="subcmd-label">Subcommand:</span> {html.escape(subcommand_desc)}</div>'
 
-        # Common patterns / examples from knowledge base
-        common_patterns = cmd.get("common_patterns", [])
-        patterns_html = ""
-        if common_patterns:
-            patterns_html = '<div class="patterns-section"><h5>Common Patterns:</h5><ul class="patterns-list">'
-            for pattern in common_patterns[:5]:
-                patterns_html += f'<li><code>{html.escape(pattern)}</code></li>'
-            patterns_html += '</ul></div>'
-
         # Output preview
         output_preview = cmd.get("output_preview", "")
         output_html = ""
@@ -427,30 +552,16 @@ def render_commands_tab(commands: list[dict]) -> str:
                                 <pre class="output-preview">{html.escape(output_preview)}</pre>
                             </div>'''
 
-        # Use cases from knowledge base
-        use_cases = cmd.get("use_cases", [])
-        use_cases_html = ""
-        if use_cases:
-            use_cases_html = '<div class="use-cases-section"><h5>Use Cases:</h5><ul class="use-cases-list">'
-            for uc in use_cases[:3]:
-                use_cases_html += f'<li>{html.escape(uc)}</li>'
-            use_cases_html += '</ul></div>'
-
-        # Gotchas / pitfalls from knowledge base
-        gotchas = cmd.get("gotchas", [])
-        gotchas_html = ""
-        if gotchas:
-            gotchas_html = '<div class="gotchas-section"><h5>Common Pitfalls:</h5><ul class="gotchas-list">'
-            for g in gotchas[:2]:
-                gotchas_html += f'<li>{html.escape(g)}</li>'
-            gotchas_html += '</ul></div>'
-
-        # Related commands
-        related = cmd.get("related", [])
-        related_html = ""
-        if related:
-            related_chips = ' '.join(f'<code class="related-cmd">{html.escape(r)}</code>' for r in related[:5])
-            related_html = f'<div class="related-section"><h5>Related:</h5> {related_chips}</div>'
+        # Use cases, pitfalls, patterns and related commands from knowledge base
+        kb_key = (
+            tuple(cmd.get("use_cases", [])[:3]),
+            tuple(cmd.get("gotchas", [])[:2]),
+            tuple(cmd.get("common_patterns", [])[:5]),
+            tuple(cmd.get("related", [])[:5]),
+        )
+        kb_html = kb_cache.get(kb_key)
+        if kb_html is None:
+            kb_html = kb_cache[kb_key] = _render_kb_sections(*kb_key)
 
         # Man page / documentation link
         man_url = cmd.get("man_url", "")
@@ -458,7 +569,7 @@ def render_commands_tab(commands: list[dict]) -> str:
         if man_url:
             man_link_html = f'<a class="man-link" href="{html.escape(man_url)}" target="_blank" rel="noopener noreferrer" title="Documentation">docs</a>'
 
-        commands_html += f'''
+        commands_parts.append(f'''
                         <div class="command-card" data-category="{category}" data-frequency="{frequency}" data-name="{base_cmd}">
                             <div class="command-header" onclick="toggleCommand('{cmd_id}')">
                                 <div class="command-main">
@@ -482,13 +593,11 @@ def render_commands_tab(commands: list[dict]) -> str:
                                 </div>
                                 {subcmd_html}
                                 {flags_html}
-                                {use_cases_html}
-                                {gotchas_html}
-                                {patterns_html}
-                                {related_html}
+                                {kb_html}
                                 {output_html}
                             </div>
-                        </div>'''
+                        </div>''')
+    commands_html = ''.join(commands_parts)
 
     return f'''
                 <div class="commands-container">
@@ -518,6 +627,60 @@ def render_commands_tab(commands: list[dict]) -> str:
                 </div>'''
 
 
+def _render_flags_section(flags: tuple[tuple[str, str], ...]) -> str:
+    """Render the flags breakdown for a command card from (flag, description) pairs."""
+    if not flags:
+        return ""
+    flags_html = '<div class="flags-section"><h5>Flags:</h5><ul class="flags-list">'
+    for name, desc in flags:
+        flag_name = html.escape(name)
+        flag_desc = html.escape(desc)
+        if flag_desc:
+            flags_html += f'<li><code class="flag">{flag_name}</code> <span class="flag-desc">{flag_desc}</span></li>'
+        else:
+            flags_html += f'<li><code class="flag">{flag_name}</code></li>'
+    return flags_html + '</ul></div>'
+
+
+def _render_kb_sections(
+    use_cases: tuple[str, ...],
+    gotchas: tuple[str, ...],
+    common_patterns: tuple[str, ...],
+    related: tuple[str, ...],
+) -> str:
+    """Render the knowledge-base sections of a command card."""
+    use_cases_html = ""
+    if use_cases:
+        use_cases_html = '<div class="use-cases-section"><h5>Use Cases:</h5><ul class="use-cases-list">'
+        for uc in use_cases:
+            use_cases_html += f'<li>{html.escape(uc)}</li>'
+        use_cases_html += '</ul></div>'
+
+    gotchas_html = ""
+    if gotchas:
+        gotchas_html = '<div class="gotchas-section"><h5>Common Pitfalls:</h5><ul class="gotchas-list">'
+        for g in gotchas:
+            gotchas_html += f'<li>{html.escape(g)}</li>'
+        gotchas_html += '</ul></div>'
+
+    patterns_html = ""
+    if common_patterns:
+        patterns_html = '<div class="patterns-section"><h5>Common Patterns:</h5><ul class="patterns-list">'
+        for pattern in common_patterns:
+            patterns_html += f'<li><code>{html.escape(pattern)}</code></li>'
+        patterns_html += '</ul></div>'
+
+    related_html = ""
+    if related:
+        related_chips = ' '.join(f'<code class="related-cmd">{html.escape(r)}</code>' for r in related)
+        related_html = f'<div class="related-section"><h5>Related:</h5> {related_chips}</div>'
+
+    return f'''{use_cases_html}
+                                {gotchas_html}
+                                {patterns_html}
+                                {related_html}'''
+
+
 def _syntax_highlight(command: str) -> str:
     """Apply syntax highlighting to a bash command."""
     if not command:
@@ -557,10 +720,12 @@ def render_lessons_tab(categories: dict, commands: list[dict]) -> str:
     if not categories:
         return '<div class="empty-state">No categories found in the session data</div>'
 
+    command_db, _ = _load_command_db()
+
     # Sort categories by command count
     sorted_cats = sorted(categories.items(), key=lambda x: len(x[1]), reverse=True)
 
-    lessons_html = ""
+    lessons_parts: list[str] = []
     for cat_name, cat_commands in sorted_cats:
         if not cat_commands:
             continue
@@ -572,7 +737,7 @@ def render_lessons_tab(categories: dict, commands: list[dict]) -> str:
         concept = _get_category_concept(cat_name)
 
         # Commands in this category
-        cat_commands_html = ""
+        cat_commands_parts: list[str] = []
         for cmd in cat_cmd_data[:10]:  # Limit to 10 per category
             base_cmd = html.escape(cmd.get("base_command", ""))
             description = html.escape(cmd.get("description", ""))
@@ -586,8 +751,8 @@ def render_lessons_tab(categories: dict, commands: list[dict]) -> str:
                 lesson_flags_html = '<div class="lesson-flags"><strong>Flags used:</strong> '
                 flag_parts = []
                 for flag in cmd_flags:
-                    fname = html.escape(flag.get("flag", "") if isinstance(flag, dict) else str(flag))
-                    fdesc = html.escape(flag.get("description", "") if isinstance(flag, dict) else "")
+                    fname = html.escape(flag if isinstance(flag, str) else flag.get("flag", ""))
+                    fdesc = html.escape("" if isinstance(flag, str) else flag.get("description", ""))
                     if fdesc:
                         flag_parts.append(f'<code class="flag">{fname}</code> ({fdesc})')
                     else:
@@ -602,7 +767,7 @@ def render_lessons_tab(categories: dict, commands: list[dict]) -> str:
 
             # Use cases and gotchas from COMMAND_DB for lessons
             lesson_use_cases = ""
-            cmd_db_info = COMMAND_DB.get(base_cmd.replace("&amp;", "&"), {})
+            cmd_db_info = command_db.get(base_cmd.replace("&amp;", "&"), {})
             uc_list = cmd_db_info.get("use_cases", [])
             if uc_list:
                 uc_items = ''.join(f'<li>{html.escape(uc)}</li>' for uc in uc_list[:2])
@@ -619,7 +784,7 @@ def render_lessons_tab(categories: dict, commands: list[dict]) -> str:
             if man_link:
                 lesson_man_url = f'<a class="man-link" href="{html.escape(man_link)}" target="_blank" rel="noopener noreferrer">docs</a>'
 
-            cat_commands_html += f'''
+            cat_commands_parts.append(f'''
                             <div class="lesson-command">
                                 <div class="lesson-command-header">
                                     <code class="cmd">{base_cmd}</code>
@@ -632,7 +797,9 @@ def render_lessons_tab(categories: dict, commands: list[dict]) -> str:
                                 {lesson_flags_html}
                                 {lesson_use_cases}
                                 {lesson_gotchas}
-                            </div>'''
+                            </div>''')
+
+        cat_commands_html = ''.join(cat_commands_parts)
 
         # Patterns observed
         patterns = _extract_patterns(cat_cmd_data)
@@ -648,7 +815,7 @@ def render_lessons_tab(categories: dict, commands: list[dict]) -> str:
         cat_base_cmds = {c.get("base_command", "") for c in cat_cmd_data}
         for cmd_item in cat_cmd_data:
             bc = cmd_item.get("base_command", "").replace("&amp;", "&")
-            cmd_db_info = COMMAND_DB.get(bc, {})
+            cmd_db_info = command_db.get(bc, {})
             for rel in cmd_db_info.get("related", []):
                 if rel not in cat_base_cmds:
                     related_set.add(rel)
@@ -660,7 +827,7 @@ def render_lessons_tab(categories: dict, commands: list[dict]) -> str:
             )
             related_html = f'<div class="lesson-related-section"><h4>Explore Related Commands:</h4><div class="related-chips">{related_chips}</div></div>'
 
-        lessons_html += f'''
+        lessons_parts.append(f'''
                     <div class="lesson-section">
                         <h2 class="lesson-title">
                             <span class="lesson-icon">{_get_category_icon(cat_name)}</span>
@@ -679,7 +846,8 @@ def render_lessons_tab(categories: dict, commands: list[dict]) -> str:
                             {patterns_html}
                             {related_html}
                         </div>
-                    </div>'''
+                    </div>''')
+    lessons_html = ''.join(lessons_parts)
 
     return f'''
                 <div class="lessons-container">
@@ -687,40 +855,46 @@ def render_lessons_tab(categories: dict, commands: list[dict]) -> str:
                 </div>'''
 
 
+# Concept overviews shown at the top of each lesson category
+_CATEGORY_CONCEPTS = {
+    "File System": "Commands for navigating, viewing, creating, and managing files and directories in the filesystem.",
+    "Text Processing": "Tools for viewing, searching, filtering, and transforming text content in files and streams.",
+    "Git": "Version control system commands for tracking changes, managing branches, and collaborating on code.",
+    "Package Management": "Package managers for installing, updating, and managing software dependencies across languages and platforms.",
+    "Process & System": "Commands for monitoring, managing, and controlling running processes and system resources.",
+    "Networking": "Commands for network operations, file transfers, remote access, and connectivity diagnostics.",
+    "Permissions": "Commands for managing file ownership, access permissions, and user/group administration.",
+    "Compression": "Commands for compressing, archiving, and extracting files using various algorithms.",
+    "Search & Navigation": "Commands for finding files, searching content, and navigating the filesystem efficiently.",
+    "Development": "Development tools for building, testing, compiling, and running code across languages.",
+    "Shell Builtins": "Built-in shell commands for scripting, variable management, and interactive shell use.",
+}
+
+
+# HTML entity icons for lesson categories
+_CATEGORY_ICONS = {
+    "File System": "&#128193;",
+    "Text Processing": "&#128196;",
+    "Git": "&#128202;",
+    "Package Management": "&#128230;",
+    "Process & System": "&#9881;",
+    "Networking": "&#127760;",
+    "Permissions": "&#128274;",
+    "Compression": "&#128230;",
+    "Search & Navigation": "&#128269;",
+    "Development": "&#128187;",
+    "Shell Builtins": "&#10095;",
+}
+
+
 def _get_category_concept(category: str) -> str:
     """Get concept overview for a category."""
-    concepts = {
-        "File System": "Commands for navigating, viewing, creating, and managing files and directories in the filesystem.",
-        "Text Processing": "Tools for viewing, searching, filtering, and transforming text content in files and streams.",
-        "Git": "Version control system commands for tracking changes, managing branches, and collaborating on code.",
-        "Package Management": "Package managers for installing, updating, and managing software dependencies across languages and platforms.",
-        "Process & System": "Commands for monitoring, managing, and controlling running processes and system resources.",
-        "Networking": "Commands for network operations, file transfers, remote access, and connectivity diagnostics.",
-        "Permissions": "Commands for managing file ownership, access permissions, and user/group administration.",
-        "Compression": "Commands for compressing, archiving, and extracting files using various algorithms.",
-        "Search & Navigation": "Commands for finding files, searching content, and navigating the filesystem efficiently.",
-        "Development": "Development tools for building, testing, compiling, and running code across languages.",
-        "Shell Builtins": "Built-in shell commands for scripting, variable management, and interactive shell use.",
-    }
-    return concepts.get(category, f"Commands related to {category.lower()} operations and utilities.")
+    return _CATEGORY_CONCEPTS.get(category, f"Commands related to {category.lower()} operations and utilities.")
 
 
 def _get_category_icon(category: str) -> str:
     """Get icon for a category."""
-    icons = {
-        "File System": "&#128193;",
-        "Text Processing": "&#128196;",
-        "Git": "&#128202;",
-        "Package Management": "&#128230;",
-        "Process & System": "&#9881;",
-        "Networking": "&#127760;",
-        "Permissions": "&#128274;",
-        "Compression": "&#128230;",
-        "Search & Navigation": "&#128269;",
-        "Development": "&#128187;",
-        "Shell Builtins": "&#10095;",
-    }
-    return icons.get(category, "&#128204;")
+    return _CATEGORY_ICONS.get(category, "&#128204;")
 
 
 def _extract_patterns(commands: list[dict]) -> list[str]:
@@ -766,7 +940,7 @@ def render_quiz_tab(quizzes: list[dict]) -> str:
                     <div class="empty-state">No quiz questions available</div>
                 </div>'''
 
-    questions_html = ""
+    questions_parts: list[str] = []
     for idx, quiz in enumerate(quizzes):
         q_id = f"q{idx}"
         question = html.escape(quiz.get("question", ""))
@@ -780,17 +954,18 @@ def render_quiz_tab(quizzes: list[dict]) -> str:
         if q_man_url:
             q_meta_html = f'<div class="quiz-meta"><a class="man-link" href="{html.escape(q_man_url)}" target="_blank" rel="noopener noreferrer">docs</a></div>'
 
-        options_html = ""
+        options_parts: list[str] = []
         for opt_idx, option in enumerate(options):
             opt_letter = chr(65 + opt_idx)  # A, B, C, D
-            options_html += f'''
+            options_parts.append(f'''
                             <label class="quiz-option" data-question="{q_id}" data-index="{opt_idx}">
                                 <input type="radio" name="{q_id}" value="{opt_idx}" onchange="checkAnswer('{q_id}', {opt_idx}, {correct})">
                                 <span class="option-letter">{opt_letter}</span>
                                 <span class="option-text">{html.escape(option)}</span>
-                            </label>'''
+                            </label>''')
+        options_html = ''.join(options_parts)
 
-        questions_html += f'''
+        questions_parts.append(f'''
                     <div class="quiz-question" id="question-{q_id}">
                         <div class="question-header">
                             <div class="question-number">Question {idx + 1}</div>
@@ -804,7 +979,8 @@ def render_quiz_tab(quizzes: list[dict]) -> str:
                             <div class="feedback-result"></div>
                             <div class="feedback-explanation">{explanation}</div>
                         </div>
-                    </div>'''
+                    </div>''')
+    questions_html = ''.join(questions_parts)
 
     return f'''
                 <div class="quiz-container">
@@ -829,9 +1005,8 @@ def render_quiz_tab(quizzes: list[dict]) -> str:
                 </div>'''
 
 
-def get_inline_css() -> str:
-    """Return all CSS styles."""
-    return '''
+# Page styles; identical for every report.
+_CSS = '''
         /* CSS Reset and Base */
         *, *::before, *::after {
             box-sizing: border-box;
@@ -2078,82 +2253,83 @@ def get_inline_css() -> str:
 '''
 
 
-def get_inline_js(quizzes: list[dict]) -> str:
-    """Return all JavaScript code."""
-    quiz_data = json.dumps(quizzes)
+def get_inline_css() -> str:
+    """Return all CSS styles."""
+    return _CSS
 
-    return f'''
-        // Quiz data
-        const quizData = {quiz_data};
+
+# Page behaviour: tabs, theme, filtering, sorting and quiz handlers. A plain
+# string, so the braces need no f-string escaping.
+_STATIC_JS = '''
         let score = 0;
         let answeredQuestions = new Set();
 
         // Tab Navigation
-        document.querySelectorAll('.tab').forEach(tab => {{
-            tab.addEventListener('click', () => {{
+        document.querySelectorAll('.tab').forEach(tab => {
+            tab.addEventListener('click', () => {
                 switchTab(tab.dataset.tab);
-            }});
-        }});
+            });
+        });
 
-        function switchTab(tabName) {{
+        function switchTab(tabName) {
             // Update tabs
-            document.querySelectorAll('.tab').forEach(t => {{
+            document.querySelectorAll('.tab').forEach(t => {
                 t.classList.remove('active');
                 t.setAttribute('aria-selected', 'false');
-            }});
-            document.querySelector(`[data-tab="${{tabName}}"]`).classList.add('active');
-            document.querySelector(`[data-tab="${{tabName}}"]`).setAttribute('aria-selected', 'true');
+            });
+            document.querySelector(`[data-tab="${tabName}"]`).classList.add('active');
+            document.querySelector(`[data-tab="${tabName}"]`).setAttribute('aria-selected', 'true');
 
             // Update panels
-            document.querySelectorAll('.panel').forEach(p => {{
+            document.querySelectorAll('.panel').forEach(p => {
                 p.classList.remove('active');
-            }});
-            document.getElementById(`panel-${{tabName}}`).classList.add('active');
-        }}
+            });
+            document.getElementById(`panel-${tabName}`).classList.add('active');
+        }
 
         // Keyboard navigation
-        document.addEventListener('keydown', (e) => {{
+        document.addEventListener('keydown', (e) => {
             if (e.target.tagName === 'INPUT' || e.target.tagName === 'TEXTAREA') return;
 
             const tabs = ['overview', 'commands', 'lessons', 'quiz'];
             const key = e.key;
 
-            if (key >= '1' && key <= '4') {{
+            if (key >= '1' && key <= '4') {
                 e.preventDefault();
                 switchTab(tabs[parseInt(key) - 1]);
-            }}
-        }});
+            }
+        });
 
         // Theme Toggle
-        function toggleTheme() {{
+        function toggleTheme() {
             const html = document.documentElement;
             const currentTheme = html.getAttribute('data-theme');
             const newTheme = currentTheme === 'dark' ? 'light' : 'dark';
             html.setAttribute('data-theme', newTheme);
             localStorage.setItem('theme', newTheme);
-        }}
+        }
 
         // Load saved theme
-        (function() {{
+        (function() {
             const savedTheme = localStorage.getItem('theme') || 'light';
             document.documentElement.setAttribute('data-theme', savedTheme);
-        }})();
+        })();
 
         // Command expansion
-        function toggleCommand(cmdId) {{
+        function toggleCommand(cmdId) {
             const details = document.getElementById(cmdId);
             const card = details.closest('.command-card');
 
             details.classList.toggle('show');
             card.classList.toggle('expanded');
-        }}
+        }
 
         // Command filtering
-        function filterCommands() {{
+        function filterCommands() {
             const searchTerm = document.getElementById('command-search').value.toLowerCase();
             const activeCategory = document.querySelector('.filter-chip.active').dataset.category;
 
-            document.querySelectorAll('.command-card').forEach(card => {{
+            document.querySelectorAll('.command-card').forEach(card => {
                 const name = card.dataset.name.toLowerCase();
                 const category = card.dataset.category;
 
@@ -2161,30 +2337,30 @@ def get_inline_js(quizzes: list[dict]) -> str:
                 const matchesCategory = activeCategory === 'all' || category === activeCategory;
 
                 card.classList.toggle('hidden', !(matchesSearch && matchesCategory));
-            }});
-        }}
+            });
+        }
 
         // Category filter chips
-        document.querySelectorAll('.filter-chip').forEach(chip => {{
-            chip.addEventListener('click', () => {{
+        document.querySelectorAll('.filter-chip').forEach(chip => {
+            chip.addEventListener('click', () => {
                 document.querySelectorAll('.filter-chip').forEach(c => c.classList.remove('active'));
                 chip.classList.add('active');
                 filterCommands();
-            }});
-        }});
+            });
+        });
 
         // Command sorting
-        function sortCommands() {{
+        function sortCommands() {
             const sortBy = document.getElementById('sort-select').value;
             const list = document.getElementById('commands-list');
             const cards = Array.from(list.querySelectorAll('.command-card'));
 
-            cards.sort((a, b) => {{
-                switch(sortBy) {{
+            cards.sort((a, b) => {
+                switch(sortBy) {
                     case 'frequency':
                         return parseInt(b.dataset.frequency) - parseInt(a.dataset.frequency);
                     case 'complexity':
-                        const order = {{'simple': 1, 'intermediate': 2, 'advanced': 3}};
+                        const order = {'simple': 1, 'intermediate': 2, 'advanced': 3};
                         return order[a.dataset.complexity] - order[b.dataset.complexity];
                     case 'category':
                         return a.dataset.category.localeCompare(b.dataset.category);
@@ -2192,32 +2368,32 @@ def get_inline_js(quizzes: list[dict]) -> str:
                         return a.dataset.name.localeCompare(b.dataset.name);
                     default:
                         return 0;
-                }}
-            }});
+                }
+            });
 
             cards.forEach(card => list.appendChild(card));
-        }}
+        }
 
         // Quiz functions
-        function checkAnswer(questionId, selectedIndex, correctIndex) {{
+        function checkAnswer(questionId, selectedIndex, correctIndex) {
             if (answeredQuestions.has(questionId)) return;
             answeredQuestions.add(questionId);
 
-            const question = document.getElementById(`question-${{questionId}}`);
+            const question = document.getElementById(`question-${questionId}`);
             const options = question.querySelectorAll('.quiz-option');
-            const feedback = document.getElementById(`feedback-${{questionId}}`);
+            const feedback = document.getElementById(`feedback-${questionId}`);
 
             const isCorrect = selectedIndex === correctIndex;
 
             // Mark options
-            options.forEach((opt, idx) => {{
+            options.forEach((opt, idx) => {
                 opt.classList.add('disabled');
-                if (idx === correctIndex) {{
+                if (idx === correctIndex) {
                     opt.classList.add('correct');
-                }} else if (idx === selectedIndex && !isCorrect) {{
+                } else if (idx === selectedIndex && !isCorrect) {
                     opt.classList.add('incorrect');
-                }}
-            }});
+                }
+            });
 
             // Show feedback
             feedback.classList.add('show');
@@ -2225,40 +2401,158 @@ def get_inline_js(quizzes: list[dict]) -> str:
             feedback.querySelector('.feedback-result').textContent = isCorrect ? 'Correct!' : 'Incorrect';
 
             // Update score
-            if (isCorrect) {{
+            if (isCorrect) {
                 score++;
                 document.getElementById('score-current').textContent = score;
-            }}
-        }}
+            }
+        }
 
-        function resetQuiz() {{
+        function resetQuiz() {
             score = 0;
             answeredQuestions.clear();
             document.getElementById('score-current').textContent = '0';
 
-            document.querySelectorAll('.quiz-question').forEach(q => {{
-                q.querySelectorAll('.quiz-option').forEach(opt => {{
+            document.querySelectorAll('.quiz-question').forEach(q => {
+                q.querySelectorAll('.quiz-option').forEach(opt => {
                     opt.classList.remove('correct', 'incorrect', 'disabled');
                     opt.querySelector('input').checked = false;
-                }});
+                });
 
                 const feedback = q.querySelector('.quiz-feedback');
                 feedback.classList.remove('show', 'correct', 'incorrect');
-            }});
-        }}
+            });
+        }
 
         // Smooth scrolling for internal links
-        document.querySelectorAll('a[href^="#"]').forEach(anchor => {{
-            anchor.addEventListener('click', function(e) {{
+        document.querySelectorAll('a[href^="#"]').forEach(anchor => {
+            anchor.addEventListener('click', function(e) {
                 e.preventDefault();
-                document.querySelector(this.getAttribute('href')).scrollIntoView({{
+                document.querySelector(this.getAttribute('href')).scrollIntoView({
                     behavior: 'smooth'
-                }});
-            }});
-        }});
+                });
+            });
+        });
     '''
 
 
+def get_inline_js(quizzes: list[dict]) -> str:
+    """Return all JavaScript code."""
+    return get_quiz_data_js(quizzes) + _STATIC_JS
+
+
+def get_quiz_data_js(quizzes: list[dict]) -> str:
+    """Return the per-page JavaScript that defines the quiz data."""
+    if orjson is not None:
+        quiz_data = orjson.dumps(quizzes, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    else:
+        quiz_data = json.dumps(quizzes)
+
+    return f'''
+        // Quiz data
+        const quizData = {quiz_data};'''
+
+
+def _summarize_inline_code(cmd_str: str) -> str:
+    """
+    Summarize the inline code passed via -c as a short one-line preview.
+
+    Prefers the first line that is not an import or comment so previews stay
+    distinctive; falls back to the first non-blank line. Truncated to 60 chars.
+    """
+    # Extract the inline code from the full command after -c
+    c_idx = cmd_str.find('-c')
+    if c_idx < 0:
+        return ''
+    raw_code = cmd_str[c_idx + 2:].strip().strip('"').strip("'")
+
+    # Split on actual newlines before collapsing
+    first_line = ''
+    for line in raw_code.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if not line.startswith(_CODE_IGNORE_PREFIXES):
+            return ' '.join(line.split())[:60]
+        if not first_line:
+            first_line = line
+    # All imports - show what's being imported
+    return ' '.join(first_line.split())[:60]
+
+
+def _bucket_complexity(distribution: Mapping[int, int]) -> dict[str, int]:
+    """
+    Fold a per-score complexity distribution (1-5) into CSS label buckets.
+
+    Uses the same _COMPLEXITY_LABELS table as the per-command labels, in a
+    single pass over the scores present. Scores outside 1-5 are ignored.
+    A distribution that is already keyed by label is passed through.
+    """
+    buckets = {'simple': 0, 'intermediate': 0, 'advanced': 0}
+    if any(isinstance(key, str) for key in distribution):
+        return {label: distribution.get(label, 0) for label in buckets}
+    for score, count in distribution.items():
+        if 1 <= score <= 5:
+            buckets[_COMPLEXITY_LABELS[score]] += count
+    return buckets
+
+
+def _format_options(options: Sequence[Any]) -> tuple[list[str], int]:
+    """
+    Convert quiz options to display strings and find the correct index.
+
+    Each option is either a {'text', 'is_correct'} dict or a plain value;
+    the shape is checked per option, so mixed lists are handled. The last
+    option marked correct wins; without one the index is 0.
+    """
+    option_texts = []
+    append = option_texts.append
+    correct_idx = 0
+    for idx, opt in enumerate(options):
+        if isinstance(opt, dict):
+            append(opt.get('text', ''))
+            if opt.get('is_correct', False):
+                correct_idx = idx
+        else:
+            append(str(opt))
+    return option_texts, correct_idx
+
+
+def _quiz_base_command(quiz: dict) -> str:
+    """Extract the base command from a quiz's command_context for enrichment lookup."""
+    cmd_ctx = quiz.get('command_context') or ''
+    return (cmd_ctx.split(None, 1) or [''])[0]
+
+
+def _format_quizzes(quizzes: Sequence[dict], command_db: Mapping[str, dict]) -> list[dict]:
+    """
+    Transform pipeline quizzes into the shape the HTML generator expects.
+
+    The HTML generator expects options as a list of strings and
+    correct_answer as an int index. Knowledge-base info is looked up once
+    per distinct base command, not per quiz.
+    """
+    quiz_base_cmds = [_quiz_base_command(quiz) for quiz in quizzes]
+    quiz_cmd_info = {bc: command_db.get(bc, _EMPTY_INFO) for bc in set(quiz_base_cmds)}
+
+    formatted_quizzes = []
+    append = formatted_quizzes.append
+    for quiz, base_cmd in zip(quizzes, quiz_base_cmds):
+        option_texts, correct_idx = _format_options(quiz.get('options', _EMPTY_TUPLE))
+
+        q_cmd_info = quiz_cmd_info[base_cmd]
+
+        append({
+            'question': quiz.get('question', ''),
+            'options': option_texts,
+            'correct_answer': correct_idx,
+            'explanation': quiz.get('explanation', ''),
+            'difficulty': q_cmd_info.get('difficulty', ''),
+            'man_url': q_cmd_info.get('man_url', ''),
+            'base_command': base_cmd,
+        })
+    return formatted_quizzes
+
+
 def generate_html_files(
     commands: List[dict],
     analysis: dict,
@@ -2281,37 +2575,35 @@ def generate_html_files(
     """
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
+    command_db, get_flags_for_command = _load_command_db()
 
     # Build analysis_result in expected format for generate_html
-    stats = analysis.get('statistics', {})
-    categories = analysis.get('categories', {})
-    analyzed_commands = analysis.get('commands', commands)
+    view = _analysis_view(analysis, commands)
+    stats = view.stats
+    analyzed_commands = view.commands
 
     # Build frequency map from top_commands (full command strings)
-    top_commands_data = analysis.get('top_commands', [])
     frequency_map = {}
-    for item in top_commands_data:
+    for item in view.top_commands:
         if isinstance(item, (list, tuple)) and len(item) >= 2:
-            cmd_str, count = item[0], item[1]
-            frequency_map[cmd_str] = count
+            frequency_map[item[0]] = item[1]
 
     # Get base command frequency for the "Top 10 Most-Used Commands" chart
     # This aggregates by base command (cd, git, mkdir) not full command strings
-    top_base_commands_data = analysis.get('top_base_commands', [])
-
-    # Map complexity scores (1-5) to string labels for CSS
-    def complexity_to_label(score):
-        if score <= 2:
-            return 'simple'
-        elif score == 3:
-            return 'intermediate'
-        else:
-            return 'advanced'
+    top_base_commands_data = view.top_base_commands
 
     # Transform commands to expected format
-    formatted_commands = []
+    formatted_commands: list[Any] = [None] * len(analyzed_commands)
+    formatted_count = 0
+    # The per-category command lists (and the category count in the stats)
+    # come from these records' 'category' field, collected in this pass
+    category_commands = defaultdict(list)
     for cmd in analyzed_commands:
         cmd_str = cmd.get('command', '')
+        # Category and base command labels repeat across rows; intern them so
+        # every record shares one string per label
+        category = sys.intern(cmd.get('category', 'Other'))
+        category_commands[category].append(cmd_str)
         base_cmd = cmd.get('base_command', cmd_str.split()[0] if cmd_str else '')
         complexity_score = cmd.get('complexity', 1)
 
@@ -2334,16 +2626,17 @@ def generate_html_files(
         if base_cmd.lower() in junk_tokens:
             continue
 
+        base_cmd = sys.intern(base_cmd)
+
         # Tokenize the command for subcommand/description generation
         cmd_tokens = cmd_str.split() if cmd_str else []
 
         # Look up COMMAND_DB info for this command
-        cmd_info = COMMAND_DB.get(base_cmd, {})
+        cmd_info = command_db.get(base_cmd, {})
         kb_flags = get_flags_for_command(base_cmd)
 
         # Convert flags to expected format WITH descriptions from knowledge base
         # Filter out non-flag tokens: bare dashes, numeric args (-5, -30), trailing colons
-        import re
         raw_flags = cmd.get('flags', [])
         formatted_flags = []
         seen_flags = set()
@@ -2352,7 +2645,7 @@ def generate_html_files(
             # Skip bare dash, numeric-only flags (-5, -30), and artifact flags with colons
             if not flag_name or flag_name == '-' or flag_name.endswith(':'):
                 continue
-            if re.match(r'^-\d+$', flag_name):
+            if flag_name.startswith('-') and flag_name[1:].isdigit():
                 continue
             # Deduplicate flags within same command
             if flag_name in seen_flags:
@@ -2363,7 +2656,7 @@ def generate_html_files(
                 flag_desc = f.get('description', '')
                 if not flag_desc and flag_name in kb_flags:
                     flag_desc = kb_flags[flag_name]
-                formatted_flags.append({'flag': flag_name, 'description': flag_desc})
+                formatted_flags.append(FormattedFlag(flag_name, flag_desc))
             elif isinstance(f, str):
                 flag_desc = kb_flags.get(f, '')
                 # For combined flags like -la, decompose into individual flags
@@ -2415,7 +2708,7 @@ def generate_html_files(
                         '-o': 'Output file',
                     }
                     flag_desc = common_flags.get(f, '')
-                formatted_flags.append({'flag': f, 'description': flag_desc})
+                formatted_flags.append(FormattedFlag(f, flag_desc))
 
         # Generate a contextual description that differentiates commands with the same base
         session_desc = cmd.get('description', '')
@@ -2423,28 +2716,14 @@ def generate_html_files(
 
         # Build a specific description from the actual command content
         args_list = cmd.get('args', [])
-        flag_list = [fl.get('flag', '') if isinstance(fl, dict) else str(fl) for fl in formatted_flags]
+        flag_list = [fl.flag for fl in formatted_flags]
         contextual_desc = ''
 
         # For inline code execution (python -c, bash -c), summarize the code snippet
         if base_cmd in ('python', 'python3', 'bash', 'sh', 'node') and '-c' in flag_list:
-            # Extract the inline code from the full command after -c
-            c_idx = cmd_str.find('-c')
-            if c_idx >= 0:
-                raw_code = cmd_str[c_idx + 2:].strip().strip('"').strip("'")
-                # Split on actual newlines before collapsing
-                code_lines = [l.strip() for l in raw_code.splitlines() if l.strip()]
-                # Find first non-import line for a distinctive preview
-                action_lines = [l for l in code_lines if not l.startswith(('import ', 'from ', '#'))]
-                if action_lines:
-                    code_part = ' '.join(action_lines[0].split())[:60]
-                elif code_lines:
-                    # All imports - show what's being imported
-                    code_part = ' '.join(code_lines[0].split())[:60]
-                else:
-                    code_part = ''
-                if code_part:
-                    contextual_desc = f"{base_cmd} -c: {code_part}{'...' if len(code_part) >= 60 else ''}"
+            code_part = _summarize_inline_code(cmd_str)
+            if code_part:
+                contextual_desc = f"{base_cmd} -c: {code_part}{'...' if len(code_part) >= 60 else ''}"
 
         # For commands with subcommands (git, npm, docker, etc.), use subcommand context
         if not contextual_desc and cmd_tokens and len(cmd_tokens) > 1:
@@ -2496,97 +2775,72 @@ def generate_html_files(
         # Get common patterns from COMMAND_DB
         common_patterns = cmd_info.get('common_patterns', [])
 
-        formatted_commands.append({
-            'base_command': base_cmd,
-            'full_command': cmd_str,
-            'category': cmd.get('category', 'Other'),
-            'complexity': complexity_to_label(complexity_score),
-            'complexity_score': complexity_score,
-            'frequency': frequency_map.get(cmd_str, 1),
-            'description': description,
-            'flags': formatted_flags,
-            'subcommand_desc': subcommand_desc,
-            'common_patterns': common_patterns[:6],
-            'args': cmd.get('args', []),
-            'is_new': False,
-            'man_url': cmd_info.get('man_url', ''),
-            'use_cases': cmd_info.get('use_cases', []),
-            'gotchas': cmd_info.get('gotchas', []),
-            'related': cmd_info.get('related', []),
-            'difficulty': cmd_info.get('difficulty', ''),
-        })
+        formatted_commands[formatted_count] = FormattedCommand(
+            base_command=base_cmd,
+            full_command=cmd_str,
+            category=category,
+            complexity=_COMPLEXITY_LABELS[min(max(complexity_score, 0), 5)],
+            complexity_score=complexity_score,
+            frequency=frequency_map.get(cmd_str, 1),
+            description=description,
+            flags=formatted_flags,
+            subcommand_desc=subcommand_desc,
+            common_patterns=common_patterns[:6],
+            args=cmd.get('args', []),
+            is_new=False,
+            man_url=cmd_info.get('man_url', ''),
+            use_cases=cmd_info.get('use_cases', []),
+            gotchas=cmd_info.get('gotchas', []),
+            related=cmd_info.get('related', []),
+            difficulty=cmd_info.get('difficulty', ''),
+        )
+        formatted_count += 1
+
+    # Drop the unused tail left by filtered-out entries
+    del formatted_commands[formatted_count:]
 
     # Transform complexity distribution from numeric keys to string labels
-    raw_complexity = stats.get('complexity_distribution', {})
-    complexity_distribution = {
-        'simple': raw_complexity.get(1, 0) + raw_complexity.get(2, 0),
-        'intermediate': raw_complexity.get(3, 0),
-        'advanced': raw_complexity.get(4, 0) + raw_complexity.get(5, 0),
-    }
+    complexity_distribution = _bucket_complexity(stats.get('complexity_distribution', {}))
 
-    # Build top commands list with proper frequencies (by base command)
-    top_10_commands = []
+    # Build top commands with proper frequencies (by base command) as
+    # parallel name/count lists
+    top_names: list[str] = []
+    top_counts: list[int] = []
     for item in top_base_commands_data[:10]:
         if isinstance(item, (list, tuple)) and len(item) >= 2:
-            top_10_commands.append({
-                'command': item[0],  # base command like "cd", "git"
-                'count': item[1]
-            })
+            top_names.append(item[0])  # base command like "cd", "git"
+            top_counts.append(item[1])
 
     analysis_result = {
         'stats': {
             'total_commands': stats.get('total_commands', len(commands)),
             'unique_commands': stats.get('unique_commands', len(commands)),
             'unique_utilities': stats.get('unique_base_commands', 0),
-            'total_categories': len(categories),
+            'total_categories': len(category_commands),
             'complexity_avg': stats.get('average_complexity', 2),
             'complexity_distribution': complexity_distribution,
-            'top_commands': top_10_commands,  # Pre-computed top commands with frequencies
-            'operators_used': analysis.get('operators_used', {}),  # Bash operators like ||, &&, |, 2>&1
+            'top_commands': {'command': top_names, 'count': top_counts},  # Pre-computed top commands with frequencies
+            'operators_used': view.operators_used,  # Bash operators like ||, &&, |, 2>&1
         },
         'commands': formatted_commands,
-        'categories': {cat: [c.get('command', '') for c in cmds] for cat, cmds in categories.items()},
+        'categories': dict(category_commands),
     }
 
     # Transform quizzes to expected format for HTML generator
-    # HTML generator expects: options as list of strings, correct_answer as int index
-    formatted_quizzes = []
-    for quiz in quizzes:
-        options = quiz.get('options', [])
-
-        # Convert options from dicts to strings and find correct index
-        option_texts = []
-        correct_idx = 0
-        for idx, opt in enumerate(options):
-            if isinstance(opt, dict):
-                option_texts.append(opt.get('text', ''))
-                if opt.get('is_correct', False):
-                    correct_idx = idx
-            else:
-                option_texts.append(str(opt))
+    formatted_quizzes = _format_quizzes(quizzes, command_db)
 
-        # Extract base command from command_context for enrichment lookup
-        cmd_ctx = quiz.get('command_context', '')
-        base_cmd = cmd_ctx.split()[0] if cmd_ctx else ''
-        q_cmd_info = COMMAND_DB.get(base_cmd, {})
-
-        formatted_quizzes.append({
-            'question': quiz.get('question', ''),
-            'options': option_texts,
-            'correct_answer': correct_idx,
-            'explanation': quiz.get('explanation', ''),
-            'difficulty': q_cmd_info.get('difficulty', ''),
-            'man_url': q_cmd_info.get('man_url', ''),
-            'base_command': base_cmd,
-        })
-
-    # Generate HTML
-    html_content = _generate_html_impl(analysis_result, formatted_quizzes)
-
-    # Write to file
+    # Stream the HTML into a temporary file next to the report and move it
+    # into place only once rendering succeeded, so a failure mid-render never
+    # leaves a truncated index.html behind
     index_file = output_dir / "index.html"
-    with open(index_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    tmp_file = output_dir / f".index.html.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            _generate_html_impl(analysis_result, formatted_quizzes, out=f)
+        os.replace(tmp_file, index_file)
+    except BaseException:
+        tmp_file.unlink(missing_ok=True)
+        raise
 
     return [index_file]
 
@@ -2615,72 +2869,8 @@ def generate_html(
 
 
 if __name__ == "__main__":
-    # Test with sample data
-    sample_analysis = {
-        "stats": {
-            "total_commands": 150,
-            "unique_commands": 45,
-            "unique_utilities": 28,
-            "date_range": {"start": "2025-01-01", "end": "2025-02-05"},
-            "complexity_distribution": {"simple": 80, "intermediate": 50, "advanced": 20}
-        },
-        "commands": [
-            {
-                "base_command": "ls",
-                "full_command": "ls -la /home/user",
-                "category": "File Management",
-                "complexity": "simple",
-                "frequency": 25,
-                "description": "List directory contents with details",
-                "flags": [{"flag": "-l", "description": "Long format"}, {"flag": "-a", "description": "Show hidden files"}],
-                "is_new": False
-            },
-            {
-                "base_command": "grep",
-                "full_command": "grep -r 'pattern' ./src",
-                "category": "Text Processing",
-                "complexity": "intermediate",
-                "frequency": 18,
-                "description": "Search for patterns in files",
-                "flags": [{"flag": "-r", "description": "Recursive search"}],
-                "is_new": True,
-                "first_seen": "2025-01-15"
-            },
-            {
-                "base_command": "find",
-                "full_command": "find . -name '*.py' -exec grep 'import' {} +",
-                "category": "Search",
-                "complexity": "advanced",
-                "frequency": 8,
-                "description": "Find files and execute commands on them",
-                "flags": [{"flag": "-name", "description": "Match filename pattern"}, {"flag": "-exec", "description": "Execute command on results"}],
-                "is_new": True,
-                "first_seen": "2025-01-20"
-            }
-        ],
-        "categories": {
-            "File Management": ["ls", "cd", "mkdir", "cp", "mv"],
-            "Text Processing": ["grep", "sed", "awk", "cat"],
-            "Search": ["find", "locate"],
-            "Network": ["curl", "wget"]
-        }
-    }
-
-    sample_quizzes = [
-        {
-            "question": "What does the -l flag do in the 'ls' command?",
-            "options": ["List only files", "Long format with details", "List hidden files", "List in reverse order"],
-            "correct_answer": 1,
-            "explanation": "The -l flag displays files in long format, showing permissions, owner, size, and modification date."
-        },
-        {
-            "question": "Which command is used to search for text patterns in files?",
-            "options": ["find", "grep", "locate", "which"],
-            "correct_answer": 1,
-            "explanation": "grep (Global Regular Expression Print) searches for text patterns in files using regular expressions."
-        }
-    ]
-
-    html_output = generate_html(sample_analysis, sample_quizzes)
-    print(f"Generated HTML length: {len(html_output)} characters")
-    print("HTML generation complete!")
+    try:
+        from scripts._html_generator_demo import main
+    except ImportError:
+        from _html_generator_demo import main
+    main()
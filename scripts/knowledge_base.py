@@ -5,28 +5,38 @@ This module provides a structured database of bash commands, operators, and conc
 for educational purposes. All content is curated for learning bash from real usage patterns.
 """
 
-from typing import Dict, Set, List, Any
+from dataclasses import dataclass
+import functools
+import re
+import sys
+from types import MappingProxyType
+from typing import ClassVar, Dict, FrozenSet, List, Mapping, Tuple, Any
+
+try:
+    from scripts._records import FieldMapping
+except ImportError:
+    from _records import FieldMapping
 
 # Command categories with their associated utilities
-CATEGORY_MAPPINGS: Dict[str, Set[str]] = {
-    "File System": {
+CATEGORY_MAPPINGS: Dict[str, FrozenSet[str]] = {
+    "File System": frozenset({
         "ls", "cd", "pwd", "mkdir", "rmdir", "rm", "cp", "mv", "touch",
         "cat", "less", "more", "head", "tail", "file", "stat", "ln",
         "readlink", "realpath", "basename", "dirname", "tree", "du", "df",
         "mount", "umount", "fdisk", "mkfs", "fsck", "lsblk", "blkid",
         "find", "locate", "updatedb", "which", "whereis", "type",
-    },
-    "Text Processing": {
+    }),
+    "Text Processing": frozenset({
         "grep", "egrep", "fgrep", "sed", "awk", "gawk", "cut", "paste",
         "sort", "uniq", "wc", "tr", "tee", "xargs", "split", "csplit",
         "join", "comm", "diff", "patch", "cmp", "od", "hexdump", "xxd",
         "strings", "expand", "unexpand", "fold", "fmt", "pr", "nl",
         "column", "rev", "shuf", "head", "tail", "tac",
-    },
-    "Git": {
+    }),
+    "Git": frozenset({
         "git", "gh", "hub", "tig", "gitk", "git-lfs",
-    },
-    "Package Management": {
+    }),
+    "Package Management": frozenset({
         "apt", "apt-get", "apt-cache", "dpkg", "snap", "flatpak",
         "yum", "dnf", "rpm", "zypper", "pacman", "yay", "paru",
         "brew", "port", "pkg", "apk",
@@ -34,8 +44,8 @@ CATEGORY_MAPPINGS: Dict[str, Set[str]] = {
         "pip", "pip3", "pipx", "conda", "poetry", "uv",
         "cargo", "rustup", "gem", "bundle", "composer", "go",
         "nuget", "dotnet", "mvn", "gradle",
-    },
-    "Process & System": {
+    }),
+    "Process & System": frozenset({
         "ps", "top", "htop", "btop", "atop", "kill", "killall", "pkill",
         "pgrep", "nice", "renice", "nohup", "bg", "fg", "jobs", "disown",
         "screen", "tmux", "byobu", "systemctl", "service", "journalctl",
@@ -44,34 +54,34 @@ CATEGORY_MAPPINGS: Dict[str, Set[str]] = {
         "watch", "wait", "sleep", "cron", "crontab", "at", "batch",
         "shutdown", "reboot", "halt", "poweroff", "init", "runlevel",
         "uname", "hostname", "hostnamectl", "timedatectl", "localectl",
-    },
-    "Networking": {
+    }),
+    "Networking": frozenset({
         "curl", "wget", "httpie", "http", "ssh", "scp", "sftp", "rsync",
         "ftp", "tftp", "nc", "netcat", "ncat", "socat", "telnet",
         "ping", "traceroute", "tracepath", "mtr", "dig", "nslookup", "host",
         "ip", "ifconfig", "route", "netstat", "ss", "arp", "arping",
         "iptables", "nft", "ufw", "firewall-cmd", "tcpdump", "wireshark",
         "nmap", "masscan", "nikto", "whois", "openssl", "certbot",
-    },
-    "Permissions": {
+    }),
+    "Permissions": frozenset({
         "chmod", "chown", "chgrp", "umask", "getfacl", "setfacl",
         "sudo", "su", "doas", "chroot", "newgrp", "id", "whoami",
         "groups", "users", "who", "w", "last", "lastlog", "finger",
         "useradd", "userdel", "usermod", "groupadd", "groupdel", "groupmod",
         "passwd", "chpasswd", "pwck", "grpck", "vipw", "vigr",
-    },
-    "Compression": {
+    }),
+    "Compression": frozenset({
         "tar", "gzip", "gunzip", "bzip2", "bunzip2", "xz", "unxz",
         "zip", "unzip", "7z", "7za", "rar", "unrar", "zstd",
         "compress", "uncompress", "lz4", "lzop", "zcat", "bzcat", "xzcat",
-    },
-    "Search & Navigation": {
+    }),
+    "Search & Navigation": frozenset({
         "find", "locate", "mlocate", "plocate", "updatedb", "which",
         "whereis", "type", "command", "hash", "apropos", "whatis", "man",
         "info", "help", "ag", "rg", "ripgrep", "ack", "fzf", "fd",
         "tree", "exa", "lsd", "broot", "ranger", "mc", "nnn", "lf",
-    },
-    "Development": {
+    }),
+    "Development": frozenset({
         "make", "cmake", "ninja", "meson", "autoconf", "automake",
         "gcc", "g++", "clang", "clang++", "cc", "ld", "as", "ar",
         "python", "python3", "python2", "node", "deno", "bun",
@@ -82,8 +92,8 @@ CATEGORY_MAPPINGS: Dict[str, Set[str]] = {
         "vagrant", "terraform", "ansible", "puppet", "chef",
         "code", "vim", "nvim", "nano", "emacs", "ed", "ex", "vi",
         "jq", "yq", "xmllint", "xsltproc", "jsonnet",
-    },
-    "Shell Builtins": {
+    }),
+    "Shell Builtins": frozenset({
         "echo", "printf", "read", "source", ".", "exec", "eval", "set",
         "unset", "export", "declare", "local", "readonly", "typeset",
         "alias", "unalias", "builtin", "command", "enable", "hash",
@@ -93,34 +103,86 @@ CATEGORY_MAPPINGS: Dict[str, Set[str]] = {
         "ulimit", "times", "let", ":", "compgen", "complete", "compopt",
         "cmd.exe", "cmd", "start", "where", "type",
         "session-slides", "learn-bash", "bash-learner", "claude",
-    },
+    }),
 }
 
 # Build reverse mapping: command -> category
-COMMAND_TO_CATEGORY: Dict[str, str] = {}
-for category, commands in CATEGORY_MAPPINGS.items():
-    for cmd in commands:
-        COMMAND_TO_CATEGORY[cmd] = category
+COMMAND_TO_CATEGORY: Dict[str, str] = {
+    cmd: category for category, commands in CATEGORY_MAPPINGS.items() for cmd in commands
+}
 
 # Operators and special constructs that increase complexity
-PIPE_OPERATORS = {"|", "|&"}
-REDIRECT_OPERATORS = {">", ">>", "<", "<<", "<<<", "2>", "2>>", "&>", "&>>", "2>&1", ">&2"}
-COMPOUND_OPERATORS = {"&&", "||", ";"}
-SUBSHELL_MARKERS = {"$(", "`", "(", ")"}
-PROCESS_SUBSTITUTION = {"<(", ">("}
+PIPE_OPERATORS = frozenset({"|", "|&"})
+REDIRECT_OPERATORS = frozenset({">", ">>", "<", "<<", "<<<", "2>", "2>>", "&>", "&>>", "2>&1", ">&2"})
+COMPOUND_OPERATORS = frozenset({"&&", "||", ";"})
+SUBSHELL_MARKERS = frozenset({"$(", "`", "(", ")"})
+PROCESS_SUBSTITUTION = frozenset({"<(", ">("})
 
 # Command patterns that indicate higher complexity
-LOOP_KEYWORDS = {"for", "while", "until", "do", "done"}
-CONDITIONAL_KEYWORDS = {"if", "then", "else", "elif", "fi", "case", "esac"}
-FUNCTION_KEYWORDS = {"function", "()"}
+LOOP_KEYWORDS = frozenset({"for", "while", "until", "do", "done"})
+CONDITIONAL_KEYWORDS = frozenset({"if", "then", "else", "elif", "fi", "case", "esac"})
+FUNCTION_KEYWORDS = frozenset({"function", "()"})
 
 # Common flag patterns by complexity contribution
-SIMPLE_FLAGS = {"-h", "--help", "-v", "--version", "-q", "--quiet"}
-MODERATE_FLAGS = {"-r", "-R", "--recursive", "-f", "--force", "-a", "--all"}
-COMPLEX_FLAGS = {"-e", "--regex", "-P", "--perl-regexp", "-E", "--extended-regexp"}
+SIMPLE_FLAGS = frozenset({"-h", "--help", "-v", "--version", "-q", "--quiet"})
+MODERATE_FLAGS = frozenset({"-r", "-R", "--recursive", "-f", "--force", "-a", "--all"})
+COMPLEX_FLAGS = frozenset({"-e", "--regex", "-P", "--perl-regexp", "-E", "--extended-regexp"})
+
+# Operator classes as bit flags, combined by classify_operators()
+OP_PIPE = 1
+OP_REDIRECT = 2
+OP_COMPOUND = 4
+OP_SUBSHELL = 8
+OP_PROCESS_SUB = 16
+
+def _build_operator_classes() -> Dict[str, int]:
+    """
+    Map each operator to the classes of every operator it contains.
+
+    An operator occurrence implies occurrences of its substrings (e.g. "||"
+    contains "|"), so folding those classes in lets classify_operators()
+    match only the longest operator at each position.
+    """
+    classes = {}
+    for group, bit in (
+        (PIPE_OPERATORS, OP_PIPE),
+        (REDIRECT_OPERATORS, OP_REDIRECT),
+        (COMPOUND_OPERATORS, OP_COMPOUND),
+        (SUBSHELL_MARKERS, OP_SUBSHELL),
+        (PROCESS_SUBSTITUTION, OP_PROCESS_SUB),
+    ):
+        for op in group:
+            classes[op] = classes.get(op, 0) | bit
+    folded = {}
+    for op in classes:
+        mask = 0
+        for other, bits in classes.items():
+            if other in op:
+                mask |= bits
+        folded[op] = mask
+    return folded
+
+OPERATOR_CLASSES: Dict[str, int] = _build_operator_classes()
+
+# Zero-width lookahead so every position is tried, longest operator first
+_OPERATOR_SCAN = re.compile(
+    "(?=(" + "|".join(re.escape(op) for op in sorted(OPERATOR_CLASSES, key=len, reverse=True)) + "))"
+)
+
+def classify_operators(command: str) -> int:
+    """
+    Get the OP_* classes of all operators occurring anywhere in a command.
+
+    Equivalent to testing every operator set with substring checks, in a
+    single regex scan.
+    """
+    mask = 0
+    for match in _OPERATOR_SCAN.finditer(command):
+        mask |= OPERATOR_CLASSES[match.group(1)]
+    return mask
 
 # Categories ordered by typical learning progression
-LEARNING_ORDER: List[str] = [
+LEARNING_ORDER: Tuple[str, ...] = (
     "Shell Builtins",
     "File System",
     "Search & Navigation",
@@ -132,26 +194,57 @@ LEARNING_ORDER: List[str] = [
     "Package Management",
     "Development",
     "Networking",
-]
+)
 
 def get_category(command: str) -> str:
     """Get the category for a given base command."""
     return COMMAND_TO_CATEGORY.get(command, "Unknown")
 
-def get_all_categories() -> List[str]:
+def get_all_categories() -> Tuple[str, ...]:
     """Get all category names in learning order."""
-    return LEARNING_ORDER.copy()
+    return LEARNING_ORDER
 
-def get_commands_in_category(category: str) -> Set[str]:
+def get_commands_in_category(category: str) -> FrozenSet[str]:
     """Get all commands in a specific category."""
-    return CATEGORY_MAPPINGS.get(category, set()).copy()
+    return CATEGORY_MAPPINGS.get(category, frozenset())
 
 
 # =============================================================================
 # COMPREHENSIVE COMMAND DATABASE
 # =============================================================================
 
-COMMAND_DB: Dict[str, Dict[str, Any]] = {
+_EMPTY_MAPPING: Mapping[str, Any] = MappingProxyType({})
+
+def _thaw(value: Any) -> Any:
+    """Recursively convert read-only views back to dicts and tuples to lists."""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+@dataclass(slots=True, frozen=True)
+class CommandSpec(FieldMapping):
+    """A command's knowledge-base entry."""
+    description: str
+    man_url: str
+    flags: Mapping[str, str]
+    common_patterns: Tuple[str, ...]
+    use_cases: Tuple[str, ...]
+    gotchas: Tuple[str, ...]
+    related: Tuple[str, ...]
+    difficulty: str
+    subcommands: Mapping[str, str]
+
+    # Only a few commands have subcommands; the others have no such key
+    _optional_fields: ClassVar[Tuple[str, ...]] = ("subcommands",)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to plain dicts and lists for serialization."""
+        return {name: _thaw(value) for name, value in self.items()}
+
+
+COMMAND_DB: Mapping[str, CommandSpec] = {
     "ls": {
         "description": "List directory contents with various formatting and filtering options. Essential for orienting yourself in the filesystem - use flags like -l for detailed permissions/sizes, -a to reveal hidden dotfiles, and -t to sort by modification time.",
         "man_url": "https://man7.org/linux/man-pages/man1/ls.1.html",
@@ -11230,11 +11323,38 @@ COMMAND_DB: Dict[str, Dict[str, Any]] = {
 }
 
 
+def _freeze_command_db(db: Dict[str, Dict[str, Any]]) -> Mapping[str, CommandSpec]:
+    """
+    Convert the database literal into CommandSpec records behind a read-only view.
+
+    Command and flag names are looked up with strings built at runtime;
+    interning makes those lookups hit the identity fast path. Long
+    description strings are unique and are left alone.
+    """
+    frozen = {}
+    for name, info in db.items():
+        subcommands = info.get("subcommands")
+        frozen[sys.intern(name)] = CommandSpec(
+            description=info.get("description", ""),
+            man_url=info.get("man_url", ""),
+            flags=MappingProxyType({sys.intern(flag): desc for flag, desc in info.get("flags", {}).items()}),
+            common_patterns=tuple(info.get("common_patterns", ())),
+            use_cases=tuple(info.get("use_cases", ())),
+            gotchas=tuple(info.get("gotchas", ())),
+            related=tuple(info.get("related", ())),
+            difficulty=sys.intern(info.get("difficulty", "")),
+            subcommands=MappingProxyType(subcommands) if subcommands else _EMPTY_MAPPING,
+        )
+    return MappingProxyType(frozen)
+
+COMMAND_DB = _freeze_command_db(COMMAND_DB)
+
+
 # =============================================================================
 # OPERATORS DATABASE
 # =============================================================================
 
-OPERATORS: Dict[str, Dict[str, str]] = {
+OPERATORS: Mapping[str, Dict[str, str]] = {
     "|": {
         "name": "Pipe",
         "description": "Send stdout of left command to stdin of right command",
@@ -11333,12 +11453,14 @@ OPERATORS: Dict[str, Dict[str, str]] = {
     },
 }
 
+OPERATORS = MappingProxyType(OPERATORS)
+
 
 # =============================================================================
 # BASH CONCEPTS
 # =============================================================================
 
-CONCEPTS: Dict[str, Dict[str, Any]] = {
+CONCEPTS: Mapping[str, Dict[str, Any]] = {
     "pipes": {
         "title": "Pipes and Pipelines",
         "description": "Pipes connect the output of one command to the input of another, allowing you to chain commands together into powerful data processing pipelines.",
@@ -11433,6 +11555,8 @@ CONCEPTS: Dict[str, Dict[str, Any]] = {
     },
 }
 
+CONCEPTS = MappingProxyType(CONCEPTS)
+
 
 # =============================================================================
 # CATEGORY DESCRIPTIONS
@@ -11457,7 +11581,7 @@ CATEGORY_DESCRIPTIONS: Dict[str, str] = {
 # HELPER FUNCTIONS
 # =============================================================================
 
-def get_command_info(name: str) -> Dict[str, Any] | None:
+def get_command_info(name: str) -> CommandSpec | None:
     """Get comprehensive command information by name."""
     return COMMAND_DB.get(name)
 
@@ -11472,33 +11596,44 @@ def get_concept(name: str) -> Dict[str, Any] | None:
     return CONCEPTS.get(name)
 
 
-def get_flags_for_command(command: str) -> Dict[str, str]:
+def get_flags_for_command(command: str) -> Mapping[str, str]:
     """Get all flags for a command."""
-    cmd = COMMAND_DB.get(command, {})
-    return cmd.get("flags", {})
+    cmd = COMMAND_DB.get(command)
+    if cmd is None:
+        return _EMPTY_MAPPING
+    return cmd.flags
 
 
-def get_common_patterns(command: str) -> List[str]:
+def get_common_patterns(command: str) -> Tuple[str, ...]:
     """Get common usage patterns for a command."""
-    cmd = COMMAND_DB.get(command, {})
-    return cmd.get("common_patterns", [])
+    cmd = COMMAND_DB.get(command)
+    if cmd is None:
+        return ()
+    return cmd.common_patterns
+
+
+@functools.cache
+def _search_index() -> Tuple[Tuple[str, str, str], ...]:
+    """Build (name, lowercased name, lowercased description) rows on first search."""
+    return tuple(
+        (name, name.lower(), info.get("description", "").lower())
+        for name, info in COMMAND_DB.items()
+    )
 
 
 def search_commands(query: str) -> List[str]:
     """Search commands by name or description."""
     query_lower = query.lower()
-    results = []
-    for name, info in COMMAND_DB.items():
-        if query_lower in name.lower():
-            results.append(name)
-        elif query_lower in info.get("description", "").lower():
-            results.append(name)
-    return results
+    return [
+        name for name, name_lower, desc_lower in _search_index()
+        if query_lower in name_lower or query_lower in desc_lower
+    ]
 
 
-def get_stats() -> Dict[str, int]:
-    """Get statistics about the knowledge base."""
-    total_flags = sum(len(cmd.get("flags", {})) for cmd in COMMAND_DB.values())
+@functools.cache
+def _compute_stats() -> Dict[str, int]:
+    """Count the knowledge base contents once; the databases never change after import."""
+    total_flags = sum(len(cmd.flags) for cmd in COMMAND_DB.values())
     total_patterns = sum(len(cmd.get("common_patterns", [])) for cmd in COMMAND_DB.values())
     return {
         "total_commands": len(COMMAND_DB),
@@ -11510,6 +11645,11 @@ def get_stats() -> Dict[str, int]:
     }
 
 
+def get_stats() -> Dict[str, int]:
+    """Get statistics about the knowledge base."""
+    return dict(_compute_stats())
+
+
 if __name__ == "__main__":
     stats = get_stats()
     print("Knowledge Base Statistics:")
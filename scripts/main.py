@@ -7,12 +7,22 @@ generates quizzes, and produces HTML learning materials.
 """
 
 import argparse
+import heapq
 import json
 import os
+import re
 import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import repeat
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Version check
 if sys.version_info < (3, 8):
@@ -22,8 +32,32 @@ if sys.version_info < (3, 8):
 # Constants
 DEFAULT_OUTPUT_BASE = "./bash-learner-output"
 MAX_UNIQUE_COMMANDS = 500
+PARALLEL_MIN_SESSIONS = 3  # Fewer sessions are loaded in-process
+FILE_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+SESSION_READ_BUFFER = 1 << 20  # 1 MiB reads when streaming session files
 VERSION = "1.1.1"
 
+# System directories the pipeline refuses to write into
+FORBIDDEN_OUTPUT_PREFIXES = ('/etc', '/usr', '/bin', '/sbin', '/lib', '/boot', '/root', '/sys', '/proc')
+
+# Operator patterns to detect, counted per command in run_extraction_pipeline
+OPERATOR_PATTERNS: Tuple[Tuple[str, "re.Pattern[str]"], ...] = (
+    ('||', re.compile(r'\|\|')),
+    ('&&', re.compile(r'&&')),
+    ('|', re.compile(r'(?<!\|)\|(?!\|)')),  # Single pipe, not ||
+    ('2>&1', re.compile(r'2>&1')),
+    ('2>/dev/null', re.compile(r'2>/dev/null')),
+    ('>', re.compile(r'(?<![2&])>(?!>|&)')),  # Single >, not >> or 2> or >&
+    ('>>', re.compile(r'>>')),
+    ('<', re.compile(r'<(?!<)')),
+)
+
+# A command is compound if it contains ||, &&, a spaced pipe, or ;
+COMPOUND_PATTERN = re.compile(r'\|\||&&| \| |;')
+
+# Sub-command delimiters (group 1) outside single- or double-quoted spans
+SUBCOMMAND_SPLIT_PATTERN = re.compile(r"""'[^']*'?|"[^"]*"?|(&&|\|\||[;|])""")
+
 
 def generate_timestamped_output_dir(base_dir: str = DEFAULT_OUTPUT_BASE) -> Path:
     """
@@ -68,12 +102,20 @@ def get_sessions_base_path() -> Path:
             if windows_path.exists():
                 return windows_path
 
-            # Try to find any user with .claude folder
-            for user_dir in windows_users.iterdir():
-                if user_dir.is_dir() and not user_dir.name.startswith(("Public", "Default")):
-                    potential_path = user_dir / ".claude" / "projects"
-                    if potential_path.exists():
-                        return potential_path
+            # Try to find any user with .claude folder. Filter by name before
+            # touching the filesystem and reuse the scandir entry for is_dir()
+            try:
+                with os.scandir(windows_users) as it:
+                    for user_entry in it:
+                        if user_entry.name.startswith(("Public", "Default")):
+                            continue
+                        if not user_entry.is_dir():
+                            continue
+                        potential_path = Path(user_entry.path) / ".claude" / "projects"
+                        if potential_path.exists():
+                            return potential_path
+            except OSError:
+                pass
 
     # Fall back to Linux path
     return linux_path
@@ -82,17 +124,44 @@ def get_sessions_base_path() -> Path:
 SESSIONS_BASE_PATH = get_sessions_base_path()
 
 
-def get_session_metadata(session_path: Path) -> Dict:
+def parse_json_line(line: Union[str, bytes]) -> Any:
+    """
+    Parse one JSONL line, using orjson when it is installed.
+
+    Lines orjson rejects are re-parsed with the standard library, which
+    accepts the same inputs as before (e.g. NaN) and raises
+    json.JSONDecodeError with its usual message for malformed lines.
+    Byte lines are decoded as UTF-8 with invalid bytes replaced.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(line)
+        except orjson.JSONDecodeError:
+            pass
+    if isinstance(line, bytes):
+        line = line.decode('utf-8', errors='replace').strip()
+    return json.loads(line)
+
+
+def get_session_metadata(
+    session_path: Path,
+    include_first_message: bool = False,
+    stat_result: Optional[os.stat_result] = None
+) -> Dict:
     """
     Extract metadata from a session file.
 
     Args:
         session_path: Path to the session JSONL file
+        include_first_message: Also read and parse the session's first line
+            into "first_message" (None otherwise)
+        stat_result: Already-known stat of the file (e.g. from os.scandir),
+            to avoid statting it again
 
     Returns:
         Dictionary with session metadata
     """
-    stat = session_path.stat()
+    stat = stat_result if stat_result is not None else session_path.stat()
     mod_time = datetime.fromtimestamp(stat.st_mtime)
 
     # Try to extract project path hint from parent directory name
@@ -100,13 +169,14 @@ def get_session_metadata(session_path: Path) -> Dict:
 
     # Try to read first line to get more metadata
     first_message = None
-    try:
-        with open(session_path, 'r', encoding='utf-8', errors='replace') as f:
-            first_line = f.readline().strip()
-            if first_line:
-                first_message = json.loads(first_line)
-    except (json.JSONDecodeError, IOError):
-        pass
+    if include_first_message:
+        try:
+            with open(session_path, 'rb') as f:
+                first_line = f.readline().strip()
+                if first_line:
+                    first_message = parse_json_line(first_line)
+        except (json.JSONDecodeError, IOError):
+            pass
 
     return {
         "path": session_path,
@@ -122,11 +192,26 @@ def get_session_metadata(session_path: Path) -> Dict:
 
 def format_file_size(size_bytes: int) -> str:
     """Format file size in human-readable format."""
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size_bytes < 1024:
-            return f"{size_bytes:.1f} {unit}"
-        size_bytes /= 1024
-    return f"{size_bytes:.1f} TB"
+    if size_bytes < 1024:
+        return f"{size_bytes:.1f} B"
+    # Each unit is 2**10 times the previous one, so the unit index follows
+    # from the bit length (of the integer part, so float sizes work too);
+    # dividing by a power of two once is exact
+    unit_index = (int(size_bytes).bit_length() - 1) // 10
+    if unit_index > 4:
+        unit_index = 4  # TB is the largest unit
+    return f"{size_bytes / (1 << (10 * unit_index)):.1f} {FILE_SIZE_UNITS[unit_index]}"
+
+
+def _scan_session_files(directory: str) -> Iterator[os.DirEntry]:
+    """Yield the *.jsonl file entries of a directory; nothing if it can't be read."""
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.endswith('.jsonl') and entry.is_file():
+                    yield entry
+    except OSError:
+        return
 
 
 def discover_sessions(
@@ -145,47 +230,53 @@ def discover_sessions(
     Returns:
         List of session metadata dictionaries, sorted by modification time (newest first)
     """
-    sessions = []
     base_path = sessions_dir or SESSIONS_BASE_PATH
 
     if not base_path.exists():
-        return sessions
+        return []
+
+    # The project filter only looks at the path, so apply it before reading
+    # any file metadata
+    filter_lower = project_filter.lower() if project_filter else None
 
     # Find all session files - check both old and new directory structures
     # New structure: projects/<hash>/sessions/*.jsonl
     # Old structure: projects/<hash>/*.jsonl
-    for project_dir in base_path.iterdir():
-        if not project_dir.is_dir():
-            continue
-
-        # Check for sessions subdirectory (new structure)
-        sessions_subdir = project_dir / "sessions"
-        if sessions_subdir.exists():
-            for session_file in sessions_subdir.glob("*.jsonl"):
-                metadata = get_session_metadata(session_file)
-                if project_filter and project_filter.lower() not in str(session_file).lower():
-                    continue
-                sessions.append(metadata)
-
-        # Also check for .jsonl files directly in project dir (old structure)
-        for session_file in project_dir.glob("*.jsonl"):
-            metadata = get_session_metadata(session_file)
-
-            # Apply project filter if specified
-            if project_filter:
-                # Check if filter matches project hash or any content
-                if project_filter.lower() not in str(session_file).lower():
-                    continue
-
-            sessions.append(metadata)
+    # Directory entries carry their file type, so a single scandir walk
+    # avoids the extra stat calls of iterdir()/exists()/glob()
+    candidates = []
+    with os.scandir(base_path) as project_dirs:
+        for project_dir in project_dirs:
+            if not project_dir.is_dir():
+                continue
 
-    # Sort by modification time (newest first)
-    sessions.sort(key=lambda x: x["modified"], reverse=True)
+            # Check for sessions subdirectory (new structure), then .jsonl
+            # files directly in the project dir (old structure)
+            for directory in (os.path.join(project_dir.path, "sessions"), project_dir.path):
+                # A filter found in the directory part matches every file in
+                # it; otherwise it may still span into a file name
+                dir_matches = not filter_lower or filter_lower in (directory + os.sep).lower()
+                for entry in _scan_session_files(directory):
+                    # Apply project filter if specified
+                    if not dir_matches and filter_lower not in entry.path.lower():
+                        continue
+                    candidates.append((entry.path, entry.stat()))
+
+    # Sort by modification time (newest first); with a limit, only the
+    # newest `limit` sessions need ordering. Metadata is built afterwards,
+    # for the returned sessions only
+    def mtime(candidate: Tuple[str, os.stat_result]) -> float:
+        return candidate[1].st_mtime
 
     if limit:
-        sessions = sessions[:limit]
+        candidates = heapq.nlargest(limit, candidates, key=mtime)
+    else:
+        candidates.sort(key=mtime, reverse=True)
 
-    return sessions
+    return [
+        get_session_metadata(Path(path), stat_result=stat)
+        for path, stat in candidates
+    ]
 
 
 def list_sessions(project_filter: Optional[str] = None, sessions_dir: Optional[Path] = None) -> None:
@@ -222,30 +313,60 @@ def list_sessions(project_filter: Optional[str] = None, sessions_dir: Optional[P
     print(f"Use -f <path> to process a specific session file")
 
 
-def load_session_file(session_path: Path) -> List[Dict]:
+def load_session_file(session_path: Path, warnings: Optional[List[str]] = None) -> Iterator[Dict]:
     """
-    Load and parse a session JSONL file.
+    Load and parse a session JSONL file, one entry at a time.
 
     Args:
         session_path: Path to the session file
+        warnings: If given, malformed-line warnings are appended here
+            instead of printed
 
-    Returns:
-        List of parsed JSON objects from the session
+    Yields:
+        Parsed JSON objects from the session
     """
-    entries = []
-
-    with open(session_path, 'r', encoding='utf-8', errors='replace') as f:
+    # Read raw bytes through a large buffer: far fewer read() calls on slow
+    # filesystems, and orjson parses UTF-8 bytes without a decode step
+    with open(session_path, 'rb', buffering=SESSION_READ_BUFFER) as f:
         for line_num, line in enumerate(f, 1):
             line = line.strip()
             if not line:
                 continue
             try:
-                entry = json.loads(line)
-                entries.append(entry)
+                yield parse_json_line(line)
             except json.JSONDecodeError as e:
-                print(f"Warning: Skipping malformed JSON at line {line_num}: {e}")
+                message = f"Warning: Skipping malformed JSON at line {line_num}: {e}"
+                if warnings is None:
+                    print(message)
+                else:
+                    warnings.append(message)
 
-    return entries
+
+def collect_session_tool_calls(
+    session_path: Path,
+    collect_tool_calls: Callable[[Iterator[Dict]], Tuple[int, Dict, Dict]]
+) -> Tuple[int, Dict[str, Dict], Dict[str, Dict], List[str]]:
+    """
+    Load one session file and collect its bash tool calls.
+
+    Module-level so it can run in a worker process; only the (much smaller)
+    tool_use/tool_result maps are sent back, not the parsed entries. They are
+    correlated in the parent, so tool_use_ids repeated across sessions (as
+    in resumed sessions) are counted once.
+
+    Args:
+        session_path: Path to the session file
+        collect_tool_calls: The extractor's collect_tool_calls function
+
+    Returns:
+        Tuple of (number of entries loaded, tool_uses, tool_results,
+        malformed-line warnings to print in session order)
+    """
+    warnings: List[str] = []
+    entry_count, tool_uses, tool_results = collect_tool_calls(
+        load_session_file(session_path, warnings)
+    )
+    return entry_count, tool_uses, tool_results, warnings
 
 
 def run_extraction_pipeline(
@@ -264,16 +385,16 @@ def run_extraction_pipeline(
     """
     # Import processing modules (lazy import to allow standalone testing)
     try:
-        from scripts.extractor import extract_commands
-        from scripts.parser import parse_commands
+        from scripts.extractor import collect_tool_calls, correlate_tool_calls
+        from scripts.parser import parse_command_dict
         from scripts.analyzer import analyze_commands
         from scripts.quiz_generator import generate_quizzes
         from scripts.html_generator import generate_html
     except ImportError:
         # Try relative import for when run as script
         try:
-            from extractor import extract_commands
-            from parser import parse_commands
+            from extractor import collect_tool_calls, correlate_tool_calls
+            from parser import parse_command_dict
             from analyzer import analyze_commands
             from quiz_generator import generate_quizzes
             from html_generator import generate_html
@@ -282,10 +403,8 @@ def run_extraction_pipeline(
 
     # Safety check: prevent writing to critical system directories
     output_resolved = output_dir.resolve()
-    forbidden_prefixes = ['/etc', '/usr', '/bin', '/sbin', '/lib', '/boot', '/root', '/sys', '/proc']
-    for prefix in forbidden_prefixes:
-        if str(output_resolved).startswith(prefix):
-            return False, f"Safety error: Cannot write to system directory: {output_resolved}"
+    if str(output_resolved).startswith(FORBIDDEN_OUTPUT_PREFIXES):
+        return False, f"Safety error: Cannot write to system directory: {output_resolved}"
 
     # Create output directory
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -294,52 +413,72 @@ def run_extraction_pipeline(
     print(f"Output directory: {output_dir.absolute()}")
     print("-" * 60)
 
-    # Step 1: Load all session data
-    all_entries = []
-    for session in sessions:
-        print(f"Loading: {session['filename']} ({session['size_human']})")
-        entries = load_session_file(session['path'])
-        all_entries.extend(entries)
-        print(f"  -> Loaded {len(entries)} entries")
+    # Steps 1-2: Load session data and collect tool calls, one session at a
+    # time. With enough sessions and cores the sessions are spread across
+    # worker processes; results still arrive in order. Merging the per-session
+    # maps and correlating once matches a single pass over all entries.
+    total_entries = 0
+    tool_uses: Dict[str, Dict] = {}
+    tool_results: Dict[str, Dict] = {}
+    workers = min(len(sessions), os.cpu_count() or 1)
+    executor = None
+    if len(sessions) >= PARALLEL_MIN_SESSIONS and workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
 
-    if not all_entries:
+    try:
+        mapper = executor.map if executor is not None else map
+        results = iter(mapper(
+            collect_session_tool_calls,
+            [session['path'] for session in sessions],
+            repeat(collect_tool_calls),
+        ))
+        for session in sessions:
+            print(f"Loading: {session['filename']} ({session['size_human']})")
+            session_entries, session_uses, session_results, warnings = next(results)
+            for warning in warnings:
+                print(warning)
+            # Number entries as one stream across sessions
+            for use_data in session_uses.values():
+                use_data['sequence'] += total_entries
+            tool_uses.update(session_uses)
+            tool_results.update(session_results)
+            total_entries += session_entries
+            print(f"  -> Loaded {session_entries} entries")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    raw_commands = correlate_tool_calls(tool_uses, tool_results)
+
+    if not total_entries:
         return False, "No session entries found in the provided files."
 
-    print(f"\nTotal entries loaded: {len(all_entries)}")
+    print(f"\nTotal entries loaded: {total_entries}")
 
-    # Step 2: Extract commands
     print("\nExtracting bash commands...")
-    raw_commands = extract_commands(all_entries)
     print(f"  -> Found {len(raw_commands)} raw commands")
 
     if not raw_commands:
         return False, ("No bash commands found in the session data. "
                       "Try analyzing more sessions with -n <number>.")
 
-    # Step 3: Parse commands
+    # Step 3: Parse commands lazily, so each parsed dict flows straight into
+    # the expand loop below instead of being collected into another list.
+    # Every extracted command is a dict, so one parse per raw command.
     print("\nParsing commands...")
-    parsed_commands = parse_commands(raw_commands)
-    print(f"  -> Parsed {len(parsed_commands)} commands")
-
-    # Step 4: Expand compound commands into individual sub-commands
-    # Also count operators for tracking
-    from collections import Counter
-    import re
+    parsed_commands = (
+        parse_command_dict(cmd['command'], cmd['description'], cmd['output'])
+        for cmd in raw_commands
+    )
+    print(f"  -> Parsed {len(raw_commands)} commands")
 
+    # Steps 4-6 in one pass: count operators, expand compound commands into
+    # individual sub-commands (parsed for their own base_command), and count
+    # frequencies BEFORE deduplication (for accurate usage stats)
     operator_frequency = Counter()
-    expanded_commands = []
-
-    # Operator patterns to detect
-    operator_patterns = {
-        '||': r'\|\|',
-        '&&': r'&&',
-        '|': r'(?<!\|)\|(?!\|)',  # Single pipe, not ||
-        '2>&1': r'2>&1',
-        '2>/dev/null': r'2>/dev/null',
-        '>': r'(?<![2&])>(?!>|&)',  # Single >, not >> or 2> or >&
-        '>>': r'>>',
-        '<': r'<(?!<)',
-    }
+    cmd_frequency = Counter()
+    base_cmd_frequency = Counter()
+    parsed_expanded = []
 
     for cmd in parsed_commands:
         cmd_str = cmd.get('command', '') or cmd.get('raw', '')
@@ -347,56 +486,42 @@ def run_extraction_pipeline(
             continue
 
         # Count operators in this command
-        for op_name, op_pattern in operator_patterns.items():
-            matches = re.findall(op_pattern, cmd_str)
+        for op_name, op_pattern in OPERATOR_PATTERNS:
+            matches = op_pattern.findall(cmd_str)
             if matches:
                 operator_frequency[op_name] += len(matches)
 
         # Check if this is a compound command
-        is_compound = any(op in cmd_str for op in ['||', '&&', ' | ', ';'])
-
-        if is_compound:
-            # Extract individual sub-commands from compound statement
-            sub_commands = extract_sub_commands(cmd_str)
-            for sub_cmd in sub_commands:
-                if sub_cmd.strip():
-                    expanded_commands.append({
-                        'command': sub_cmd.strip(),
-                        'raw': sub_cmd.strip(),
-                        'original_compound': cmd_str,
-                        'description': cmd.get('description', ''),
-                        'output': cmd.get('output', ''),
-                    })
+        if COMPOUND_PATTERN.search(cmd_str) is not None:
+            # Extract and parse individual sub-commands from compound statement
+            description = cmd.get('description', '')
+            output = cmd.get('output', '')
+            expanded = [
+                parse_command_dict(sub_cmd, description, output)
+                for sub_cmd in extract_sub_commands(cmd_str)
+            ]
         else:
-            # Simple command - add as-is
-            expanded_commands.append(cmd)
+            # Simple command - already parsed
+            expanded = [cmd]
 
-    print(f"  -> Expanded to {len(expanded_commands)} individual commands")
+        # Parser dicts always carry 'command' (the raw string) and
+        # 'base_command', so later passes index them directly
+        for sub in expanded:
+            parsed_expanded.append(sub)
+            cmd_frequency[sub['command']] += 1
+            base_cmd = sub['base_command']
+            if base_cmd:
+                base_cmd_frequency[base_cmd] += 1
 
-    # Step 5: Re-parse expanded commands to get proper base_command for each
-    parsed_expanded = parse_commands(expanded_commands)
-
-    # Step 6: Count frequencies BEFORE deduplication (for accurate usage stats)
-    cmd_frequency = Counter()
-    base_cmd_frequency = Counter()
-
-    for cmd in parsed_expanded:
-        cmd_str = cmd.get('command', '') or cmd.get('raw', '')
-        base_cmd = cmd.get('base_command', '')
-        if cmd_str:
-            cmd_frequency[cmd_str] += 1
-        if base_cmd:
-            base_cmd_frequency[base_cmd] += 1
+    print(f"  -> Expanded to {len(parsed_expanded)} individual commands")
 
     # Step 7: Deduplicate and attach frequency data
     unique_commands = deduplicate_commands(parsed_expanded)
 
     # Add frequency to each unique command
     for cmd in unique_commands:
-        cmd_str = cmd.get('command', '') or cmd.get('raw', '')
-        base_cmd = cmd.get('base_command', '')
-        cmd['frequency'] = cmd_frequency.get(cmd_str, 1)
-        cmd['base_frequency'] = base_cmd_frequency.get(base_cmd, 1)
+        cmd['frequency'] = cmd_frequency.get(cmd['command'], 1)
+        cmd['base_frequency'] = base_cmd_frequency.get(cmd['base_command'], 1)
 
     if len(unique_commands) > MAX_UNIQUE_COMMANDS:
         print(f"\nCapping at {MAX_UNIQUE_COMMANDS} unique commands "
@@ -446,7 +571,7 @@ def run_extraction_pipeline(
                 }
                 for s in sessions
             ],
-            "total_entries": len(all_entries),
+            "total_entries": total_entries,
         },
         "analysis": {
             "raw_commands_found": len(raw_commands),
@@ -466,9 +591,18 @@ def run_extraction_pipeline(
         },
     }
 
+    # Serialize in one go and write the bytes with a single call
+    if orjson is not None:
+        summary_bytes = orjson.dumps(
+            summary,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+        )
+    else:
+        summary_bytes = json.dumps(summary, indent=2).encode('utf-8')
+
     summary_path = output_dir / "summary.json"
-    with open(summary_path, 'w', encoding='utf-8') as f:
-        json.dump(summary, f, indent=2)
+    with open(summary_path, 'wb') as f:
+        f.write(summary_bytes)
 
     print(f"\nSummary written to: {summary_path}")
 
@@ -488,8 +622,6 @@ def extract_sub_commands(cmd_str: str) -> List[str]:
     Returns:
         List of individual sub-command strings
     """
-    import re
-
     if not cmd_str or not cmd_str.strip():
         return []
 
@@ -497,68 +629,26 @@ def extract_sub_commands(cmd_str: str) -> List[str]:
     # quoted code would produce garbage fragments
     inline_patterns = [' -c "', " -c '", ' -c $', ' -e "', " -e '", ' -e $',
                        ' -c\n', ' -c\r']
-    first_token = cmd_str.split()[0] if cmd_str.split() else ''
+    # cmd_str has a non-space character here, so there is always a first token
+    first_token = cmd_str.split(None, 1)[0]
     if first_token in ('python', 'python3', 'node', 'bash', 'sh', 'ruby', 'perl'):
         for pat in inline_patterns:
             if pat in cmd_str:
                 return [cmd_str.strip()]
 
-    # Quote-aware splitting: track quote depth to avoid splitting inside quotes
+    # Quote-aware splitting: quoted spans (an unterminated quote runs to the
+    # end) are matched whole, so only delimiters outside quotes are captured
     sub_commands = []
-    current = []
-    in_single = False
-    in_double = False
-    i = 0
-    chars = cmd_str
-
-    while i < len(chars):
-        c = chars[i]
-
-        # Track quoting state
-        if c == "'" and not in_double:
-            in_single = not in_single
-            current.append(c)
-            i += 1
-        elif c == '"' and not in_single:
-            in_double = not in_double
-            current.append(c)
-            i += 1
-        elif not in_single and not in_double:
-            # Check for compound operators outside quotes
-            remaining = chars[i:]
-            if remaining.startswith('&&'):
-                cmd = ''.join(current).strip()
-                if cmd:
-                    sub_commands.append(cmd)
-                current = []
-                i += 2
-            elif remaining.startswith('||'):
-                cmd = ''.join(current).strip()
-                if cmd:
-                    sub_commands.append(cmd)
-                current = []
-                i += 2
-            elif c == ';':
-                cmd = ''.join(current).strip()
-                if cmd:
-                    sub_commands.append(cmd)
-                current = []
-                i += 1
-            elif c == '|' and not remaining.startswith('||'):
-                cmd = ''.join(current).strip()
-                if cmd:
-                    sub_commands.append(cmd)
-                current = []
-                i += 1
-            else:
-                current.append(c)
-                i += 1
-        else:
-            current.append(c)
-            i += 1
+    start = 0
+    for match in SUBCOMMAND_SPLIT_PATTERN.finditer(cmd_str):
+        if match.group(1):
+            cmd = cmd_str[start:match.start()].strip()
+            if cmd:
+                sub_commands.append(cmd)
+            start = match.end()
 
     # Add final segment
-    cmd = ''.join(current).strip()
+    cmd = cmd_str[start:].strip()
     if cmd:
         sub_commands.append(cmd)
 
@@ -575,17 +665,17 @@ def deduplicate_commands(commands: List[Dict]) -> List[Dict]:
     Returns:
         Deduplicated list of commands
     """
-    seen = set()
-    unique = []
+    # dicts preserve insertion order, so setdefault keeps the first
+    # occurrence of each key with a single hash lookup
+    unique: Dict[str, Dict] = {}
 
     for cmd in commands:
         # Create a key based on the command string
         key = cmd.get('command', '') or cmd.get('raw', '')
-        if key and key not in seen:
-            seen.add(key)
-            unique.append(cmd)
+        if key:
+            unique.setdefault(key, cmd)
 
-    return unique
+    return list(unique.values())
 
 
 def parse_arguments() -> argparse.Namespace:
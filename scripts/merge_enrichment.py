@@ -11,12 +11,13 @@ Usage:
     python scripts/merge_enrichment.py [--dry-run]
 """
 
+import ast
 import sys
 import re
 import importlib
 import importlib.util
 from pathlib import Path
-from typing import Dict, Any
+from typing import Any, Callable, Dict, List, Tuple
 
 
 def load_enrichment_module(filepath: Path) -> Dict[str, Any]:
@@ -45,6 +46,55 @@ def collect_all_enrichments(scripts_dir: Path) -> Dict[str, Any]:
     return merged
 
 
+def _source_offsets(content: str) -> Callable[[int, int], int]:
+    """Return a converter from ast (lineno, col_offset) to an index into content."""
+    line_starts = [0] + [m.end() for m in re.finditer('\n', content)]
+
+    def to_index(lineno: int, col_offset: int) -> int:
+        # ast column offsets count UTF-8 bytes, not characters
+        line_start = line_starts[lineno - 1]
+        line = content[line_start:line_start + col_offset]
+        if not line.isascii():
+            line = line.encode('utf-8')[:col_offset].decode('utf-8', errors='ignore')
+        return line_start + len(line)
+
+    return to_index
+
+
+def _index_command_db(content: str) -> Dict[str, Tuple[ast.Constant, ast.Dict]]:
+    """
+    Map each COMMAND_DB command name to its (key, value) nodes.
+
+    The file is parsed once with ast, so entry boundaries come from the real
+    syntax tree instead of scanning braces and strings by hand.
+    """
+    tree = ast.parse(content)
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            targets = node.targets
+        elif isinstance(node, ast.AnnAssign):
+            targets = [node.target]
+        else:
+            continue
+        if (any(isinstance(t, ast.Name) and t.id == 'COMMAND_DB' for t in targets)
+                and isinstance(node.value, ast.Dict)):
+            return {
+                key.value: (key, value)
+                for key, value in zip(node.value.keys, node.value.values)
+                if isinstance(key, ast.Constant) and isinstance(value, ast.Dict)
+            }
+    return {}
+
+
+def _dict_fields(node: ast.Dict) -> Dict[str, ast.expr]:
+    """Map the string keys of a dict literal to their value nodes."""
+    return {
+        key.value: value
+        for key, value in zip(node.keys, node.values)
+        if isinstance(key, ast.Constant) and isinstance(key.value, str)
+    }
+
+
 def merge_into_knowledge_base(kb_path: Path, enrichments: Dict[str, Any], dry_run: bool = False) -> int:
     """
     Merge enrichment data into knowledge_base.py by modifying COMMAND_DB entries.
@@ -59,112 +109,33 @@ def merge_into_knowledge_base(kb_path: Path, enrichments: Dict[str, Any], dry_ru
     enriched_count = 0
     fields_to_add = ['man_url', 'use_cases', 'gotchas', 'related', 'difficulty']
 
+    # Locate every COMMAND_DB entry from one parse of the file
+    entries = _index_command_db(content)
+    to_index = _source_offsets(content)
+
+    # Edits are collected as (start, end, replacement) spans of the original
+    # content and applied together at the end, so every offset taken from
+    # the parse stays valid
+    edits: List[Tuple[int, int, str]] = []
+
     for cmd_name, enrichment in enrichments.items():
-        # Find this command's entry in COMMAND_DB
-        # Pattern: "cmd_name": { ... },
-        # We look for the closing "}, " or "},\n" of this entry
-
-        # Find the start of this command's dict entry
-        # Handle both regular command names and special ones like "."
-        escaped_name = re.escape(cmd_name)
-        entry_pattern = rf'    "{escaped_name}": \{{'
-        match = re.search(entry_pattern, content)
-        if not match:
+        if cmd_name not in entries:
             print(f"  WARNING: Command '{cmd_name}' not found in COMMAND_DB, skipping")
             continue
+        _, entry_node = entries[cmd_name]
+        entry_fields = _dict_fields(entry_node)
 
-        entry_start = match.start()
-
-        # Find the closing of this entry by counting braces
-        brace_depth = 0
-        entry_end = -1
-        i = match.end() - 1  # Start at the opening brace
-        while i < len(content):
-            char = content[i]
-            if char == '{':
-                brace_depth += 1
-            elif char == '}':
-                brace_depth -= 1
-                if brace_depth == 0:
-                    entry_end = i
-                    break
-            # Skip string contents to avoid counting braces in strings
-            elif char == '"':
-                i += 1
-                while i < len(content) and content[i] != '"':
-                    if content[i] == '\\':
-                        i += 1  # Skip escaped char
-                    i += 1
-            elif char == "'":
-                i += 1
-                while i < len(content) and content[i] != "'":
-                    if content[i] == '\\':
-                        i += 1
-                    i += 1
-            i += 1
-
-        if entry_end == -1:
-            print(f"  WARNING: Could not find end of entry for '{cmd_name}', skipping")
-            continue
-
-        # Extract the entry content
-        entry_content = content[entry_start:entry_end + 1]
+        # Position of the entry's closing brace
+        entry_end = to_index(entry_node.end_lineno, entry_node.end_col_offset) - 1
 
         # Check which fields are missing
         additions = []
         for field in fields_to_add:
-            if f'"{field}"' not in entry_content:
+            if field not in entry_fields:
                 value = enrichment.get(field)
                 if value:
                     additions.append((field, value))
 
-        # Handle extra_flags: merge into existing flags dict
-        extra_flags = enrichment.get('extra_flags', {})
-        if extra_flags and '"flags"' in entry_content:
-            # Find the flags dict closing brace and add new flags before it
-            flags_additions = []
-            for flag, desc in extra_flags.items():
-                escaped_flag = flag.replace('"', '\\"')
-                if f'"{escaped_flag}"' not in entry_content:
-                    flags_additions.append(f'            "{escaped_flag}": "{desc}",')
-            if flags_additions:
-                # Find the closing of the flags dict within this entry
-                flags_match = re.search(r'"flags":\s*\{', entry_content)
-                if flags_match:
-                    flags_start = flags_match.end()
-                    # Find closing brace of flags
-                    fb_depth = 1
-                    fi = flags_start
-                    while fi < len(entry_content) and fb_depth > 0:
-                        if entry_content[fi] == '{':
-                            fb_depth += 1
-                        elif entry_content[fi] == '}':
-                            fb_depth -= 1
-                        elif entry_content[fi] == '"':
-                            fi += 1
-                            while fi < len(entry_content) and entry_content[fi] != '"':
-                                if entry_content[fi] == '\\':
-                                    fi += 1
-                                fi += 1
-                        fi += 1
-                    flags_end_pos = entry_start + fi - 1
-                    # Insert new flags before the closing brace
-                    flags_insert = '\n' + '\n'.join(flags_additions) + '\n        '
-                    content = content[:flags_end_pos] + flags_insert + content[flags_end_pos:]
-                    # Recalculate entry_end since we modified content
-                    entry_end += len(flags_insert)
-
-        # Handle improved_description: replace existing description
-        improved_desc = enrichment.get('improved_description')
-        if improved_desc and '"description"' in entry_content:
-            # Replace the existing description string
-            desc_pattern = rf'(    "{escaped_name}": \{{[^}}]*?"description":\s*)"([^"]*(?:\\.[^"]*)*)"'
-            new_desc = improved_desc.replace('"', '\\"')
-            content = re.sub(desc_pattern, rf'\1"{new_desc}"', content, count=1)
-
-        if not additions:
-            continue
-
         # Build the insertion text
         insertion_lines = []
         for field, value in additions:
@@ -183,39 +154,54 @@ def merge_into_knowledge_base(kb_path: Path, enrichments: Dict[str, Any], dry_ru
                             insertion_lines.append(f'            "{escaped_v}",')
                         insertion_lines.append(f'        ],')
 
+        # Insert new fields before the closing brace of the entry
         if insertion_lines:
             insertion = '\n' + '\n'.join(insertion_lines)
-            # Recalculate entry_end in current content
-            match2 = re.search(entry_pattern, content)
-            if match2:
-                brace_depth = 0
-                i2 = match2.end() - 1
-                while i2 < len(content):
-                    char = content[i2]
-                    if char == '{':
-                        brace_depth += 1
-                    elif char == '}':
-                        brace_depth -= 1
-                        if brace_depth == 0:
-                            entry_end = i2
-                            break
-                    elif char == '"':
-                        i2 += 1
-                        while i2 < len(content) and content[i2] != '"':
-                            if content[i2] == '\\':
-                                i2 += 1
-                            i2 += 1
-                    elif char == "'":
-                        i2 += 1
-                        while i2 < len(content) and content[i2] != "'":
-                            if content[i2] == '\\':
-                                i2 += 1
-                            i2 += 1
-                    i2 += 1
-
-                # Insert before the closing brace
-                content = content[:entry_end] + insertion + '\n    ' + content[entry_end:]
-                enriched_count += 1
+            edits.append((entry_end, entry_end, insertion + '\n    '))
+            enriched_count += 1
+
+        # Handle extra_flags: merge into existing flags dict
+        extra_flags = enrichment.get('extra_flags', {})
+        flags_node = entry_fields.get('flags')
+        if extra_flags and isinstance(flags_node, ast.Dict):
+            # Some entries list subcommands alongside flags; don't duplicate
+            # a name that is already a key of either dict
+            existing_flags = set(_dict_fields(flags_node))
+            subcommands_node = entry_fields.get('subcommands')
+            if isinstance(subcommands_node, ast.Dict):
+                existing_flags.update(_dict_fields(subcommands_node))
+            flags_additions = []
+            for flag, desc in extra_flags.items():
+                escaped_flag = flag.replace('"', '\\"')
+                if flag not in existing_flags:
+                    flags_additions.append(f'            "{escaped_flag}": "{desc}",')
+            if flags_additions:
+                # Insert new flags before the closing brace of the flags dict
+                flags_end_pos = to_index(flags_node.end_lineno, flags_node.end_col_offset) - 1
+                flags_insert = '\n' + '\n'.join(flags_additions) + '\n        '
+                edits.append((flags_end_pos, flags_end_pos, flags_insert))
+
+        # Handle improved_description: replace existing description
+        improved_desc = enrichment.get('improved_description')
+        desc_node = entry_fields.get('description')
+        if improved_desc and isinstance(desc_node, ast.Constant) and isinstance(desc_node.value, str):
+            # Replace the existing description string
+            new_desc = improved_desc.replace('"', '\\"')
+            desc_start = to_index(desc_node.lineno, desc_node.col_offset)
+            desc_end = to_index(desc_node.end_lineno, desc_node.end_col_offset)
+            edits.append((desc_start, desc_end, f'"{new_desc}"'))
+
+    # Apply all edits in one pass over the file
+    if edits:
+        edits.sort(key=lambda edit: edit[0])
+        pieces = []
+        pos = 0
+        for start, end, replacement in edits:
+            pieces.append(content[pos:start])
+            pieces.append(replacement)
+            pos = end
+        pieces.append(content[pos:])
+        content = ''.join(pieces)
 
     if content != original_content:
         if dry_run:
@@ -606,24 +606,45 @@ def parse_commands(
     parsed_objs = parser.parse_batch(normalized)
 
     # Convert ParsedCommand objects to dicts for pipeline compatibility
-    return [
-        {
-            'command': p.raw,
-            'raw': p.raw,
-            'base_command': p.base_commands[0] if p.base_commands else '',
-            'base_commands': p.base_commands,
-            'flags': p.flags,
-            'args': p.arguments,
-            'pipes': p.pipes,
-            'redirects': p.redirects,
-            'category': p.category.value if p.category else 'unknown',
-            'complexity': p.complexity_score,
-            'description': p.description,
-            'output': p.output,
-            'is_compound': len(p.base_commands) > 1 or len(p.pipes) > 0,
-        }
-        for p in parsed_objs
-    ]
+    return [_pipeline_dict(p) for p in parsed_objs]
+
+
+def parse_command_dict(
+    command: str,
+    description: str = "",
+    output: str = ""
+) -> dict:
+    """
+    Parse a single bash command into the dict form returned by parse_commands.
+
+    Args:
+        command: The raw bash command string
+        description: Optional description
+        output: Optional command output
+
+    Returns:
+        Parsed command dictionary
+    """
+    return _pipeline_dict(parse_command(command, description, output))
+
+
+def _pipeline_dict(p: ParsedCommand) -> dict:
+    """Convert a ParsedCommand to the dict form used by the pipeline."""
+    return {
+        'command': p.raw,
+        'raw': p.raw,
+        'base_command': p.base_commands[0] if p.base_commands else '',
+        'base_commands': p.base_commands,
+        'flags': p.flags,
+        'args': p.arguments,
+        'pipes': p.pipes,
+        'redirects': p.redirects,
+        'category': p.category.value if p.category else 'unknown',
+        'complexity': p.complexity_score,
+        'description': p.description,
+        'output': p.output,
+        'is_compound': len(p.base_commands) > 1 or len(p.pipes) > 0,
+    }
 
 
 if __name__ == "__main__":
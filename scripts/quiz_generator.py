@@ -13,7 +13,9 @@ Uses ONLY Python standard library.
 
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional
+from types import MappingProxyType
+from typing import Mapping, Optional
+import functools
 import random
 import re
 import hashlib
@@ -29,11 +31,13 @@ except ImportError:
         def get_flags_for_command(command): return {}
 
 
-def _get_flags_for_cmd(cmd: str) -> dict[str, str]:
+@functools.cache
+def _get_flags_for_cmd(cmd: str) -> Mapping[str, str]:
     """Get merged flags for a command from knowledge_base (primary) and local FLAG_DATABASE (fallback).
 
     Knowledge_base.py COMMAND_DB is the authoritative source. FLAG_DATABASE provides
-    additional coverage for commands not yet in knowledge_base.
+    additional coverage for commands not yet in knowledge_base. Both sources are
+    static, so the merge is done once per command and returned read-only.
     """
     flags = {}
     # Primary source: knowledge_base COMMAND_DB
@@ -45,7 +49,7 @@ def _get_flags_for_cmd(cmd: str) -> dict[str, str]:
         for flag, desc in FLAG_DATABASE[cmd].items():
             if flag not in flags:
                 flags[flag] = desc
-    return flags
+    return MappingProxyType(flags)
 
 
 def _get_all_flagged_commands() -> set[str]:
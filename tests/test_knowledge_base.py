@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for the knowledge base module.
+
+Tests operator classification against plain substring checks, both
+directly and through the analyzer's parse_command.
+"""
+
+import unittest
+import random
+import sys
+import os
+
+# Add the scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+from knowledge_base import (
+    OP_PIPE,
+    OP_REDIRECT,
+    OP_COMPOUND,
+    OP_SUBSHELL,
+    OP_PROCESS_SUB,
+    PIPE_OPERATORS,
+    REDIRECT_OPERATORS,
+    COMPOUND_OPERATORS,
+    SUBSHELL_MARKERS,
+    PROCESS_SUBSTITUTION,
+    classify_operators,
+)
+from analyzer import parse_command
+
+
+def substring_classes(command):
+    """Classify operators with the substring checks parse_command used before."""
+    mask = 0
+    for operators, bit in (
+        (PIPE_OPERATORS, OP_PIPE),
+        (REDIRECT_OPERATORS, OP_REDIRECT),
+        (COMPOUND_OPERATORS, OP_COMPOUND),
+        (SUBSHELL_MARKERS, OP_SUBSHELL),
+        (PROCESS_SUBSTITUTION, OP_PROCESS_SUB),
+    ):
+        if any(op in command for op in operators):
+            mask |= bit
+    return mask
+
+
+class TestClassifyOperators(unittest.TestCase):
+    """Test the single-scan operator classification."""
+
+    def test_no_operators(self):
+        """Test a plain command has no operator classes."""
+        self.assertEqual(classify_operators("ls -la src"), 0)
+        self.assertEqual(classify_operators(""), 0)
+
+    def test_single_operators(self):
+        """Test each operator on its own sets its class."""
+        cases = {
+            "cat f | wc -l": OP_PIPE,
+            "make || echo failed": OP_PIPE | OP_COMPOUND,
+            "make && make install": OP_COMPOUND,
+            "cd src; ls": OP_COMPOUND,
+            "echo hi > out.txt": OP_REDIRECT,
+            "echo hi >> out.txt": OP_REDIRECT,
+            "make 2>&1": OP_REDIRECT,
+            "sort < in.txt": OP_REDIRECT,
+            "echo $(date)": OP_SUBSHELL,
+            "echo `date`": OP_SUBSHELL,
+            "diff <(ls a) <(ls b)": OP_REDIRECT | OP_SUBSHELL | OP_PROCESS_SUB,
+        }
+        for command, expected in cases.items():
+            with self.subTest(command=command):
+                self.assertEqual(classify_operators(command), expected)
+                self.assertEqual(classify_operators(command), substring_classes(command))
+
+    def test_overlapping_operators(self):
+        """Test operators containing shorter operators set both classes."""
+        # "||" contains "|", ">>" contains ">", "2>&1" contains ">"
+        self.assertEqual(classify_operators("a || b"), OP_PIPE | OP_COMPOUND)
+        self.assertEqual(classify_operators("a >> b") & OP_REDIRECT, OP_REDIRECT)
+        self.assertEqual(classify_operators("a 2>&1"), OP_REDIRECT)
+        self.assertEqual(classify_operators("a |& b"), OP_PIPE)
+        # Overlapping occurrences: "|||" holds "||" at both positions
+        self.assertEqual(classify_operators("a ||| b"), substring_classes("a ||| b"))
+        self.assertEqual(classify_operators(">>>"), substring_classes(">>>"))
+        self.assertEqual(classify_operators("<<<("), substring_classes("<<<("))
+
+    def test_combined_operators(self):
+        """Test several operator classes in one command."""
+        command = "for f in $(ls); do cat $f | grep x >> out 2>&1 && echo ok; done"
+        self.assertEqual(
+            classify_operators(command),
+            OP_PIPE | OP_REDIRECT | OP_COMPOUND | OP_SUBSHELL,
+        )
+
+    def test_matches_substring_checks(self):
+        """Test random operator soups classify like the substring checks."""
+        rng = random.Random(0)
+        pieces = ["|", "||", "&", "&&", ";", ">", ">>", "<", "<<", "2", "1",
+                  "$(", "`", "(", ")", "<(", ">(", " ", "a"]
+        for _ in range(5000):
+            command = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 10)))
+            self.assertEqual(classify_operators(command), substring_classes(command), command)
+
+    def test_parse_command_flags(self):
+        """Test parse_command's has_* flags match the substring checks."""
+        for command in [
+            "ls", "a | b", "a || b", "a && b", "a; b", "a > f", "a >> f",
+            "a 2>&1", "a < f", "echo $(date)", "echo `date`", "diff <(a) >(b)",
+            "x ||| y >>> z",
+        ]:
+            with self.subTest(command=command):
+                parsed = parse_command(command)
+                self.assertEqual(parsed.has_pipe, any(op in command for op in PIPE_OPERATORS))
+                self.assertEqual(parsed.has_redirect, any(op in command for op in REDIRECT_OPERATORS))
+                self.assertEqual(parsed.has_compound, any(op in command for op in COMPOUND_OPERATORS))
+                self.assertEqual(parsed.has_subshell, any(op in command for op in SUBSHELL_MARKERS))
+                self.assertEqual(parsed.has_process_sub, any(op in command for op in PROCESS_SUBSTITUTION))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
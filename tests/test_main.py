@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Tests for the main pipeline module.
+
+Tests loading several session files into one command stream and splitting
+compound commands into sub-commands.
+"""
+
+import unittest
+import contextlib
+import io
+import json
+import sys
+import os
+import random
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+# Add the scripts directory to path for imports; the pipeline modules import
+# each other by bare module name, as when main.py is run as a script
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+import main
+
+
+def tool_use_line(tool_use_id, command):
+    """Build a session line holding one Bash tool_use block."""
+    return json.dumps({
+        "type": "assistant",
+        "message": {"content": [{
+            "type": "tool_use", "id": tool_use_id, "name": "Bash",
+            "input": {"command": command, "description": "run"},
+        }]},
+    })
+
+
+def tool_result_line(tool_use_id, output):
+    """Build a session line holding one tool_result block."""
+    return json.dumps({
+        "type": "user",
+        "message": {"content": [{
+            "type": "tool_result", "tool_use_id": tool_use_id, "content": output,
+        }]},
+    })
+
+
+def session_lines(ids_and_commands):
+    """Build the lines of a session running each (id, command) in turn."""
+    lines = []
+    for tool_use_id, command in ids_and_commands:
+        lines.append(tool_use_line(tool_use_id, command))
+        lines.append(tool_result_line(tool_use_id, "ok"))
+    return lines
+
+
+class TestSessionLoading(unittest.TestCase):
+    """Test loading and extracting commands from several sessions."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.project_dir = Path(self.tmp.name) / "projects" / "-home-user-proj"
+        self.project_dir.mkdir(parents=True)
+
+    def write_session(self, name, lines):
+        path = self.project_dir / name
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return path
+
+    def run_pipeline(self, paths, cpu_count=1):
+        """Run the pipeline over session files; return (summary, log)."""
+        sessions = [main.get_session_metadata(path) for path in paths]
+        output_dir = Path(self.tmp.name) / "out"
+        log = io.StringIO()
+        with mock.patch.object(main.os, "cpu_count", return_value=cpu_count), \
+                contextlib.redirect_stdout(log):
+            ok, message = main.run_extraction_pipeline(sessions, output_dir)
+        self.assertTrue(ok, message)
+        summary = json.loads((output_dir / "summary.json").read_text(encoding="utf-8"))
+        return summary, log.getvalue()
+
+    def resumed_sessions(self):
+        """Two sessions where the second resumes and replays ten of the first's calls."""
+        first = [(f"toolu_{i}", "echo hi" if i % 2 else "ls -la") for i in range(20)]
+        second = first[10:] + [(f"toolu_{i}", "git status") for i in range(20, 25)]
+        return (
+            self.write_session("a.jsonl", session_lines(first)),
+            self.write_session("b.jsonl", session_lines(second)),
+        )
+
+    def top_counts(self, summary):
+        return {
+            item["command"]: item["count"]
+            for item in summary["analysis"]["top_base_commands"]
+        }
+
+    def test_repeated_tool_use_ids_counted_once(self):
+        """Test tool calls replayed by a resumed session are not double counted."""
+        summary, _ = self.run_pipeline(self.resumed_sessions())
+
+        self.assertEqual(summary["input"]["total_entries"], 70)
+        self.assertEqual(summary["analysis"]["raw_commands_found"], 25)
+        self.assertEqual(
+            self.top_counts(summary),
+            {"echo": 10, "ls": 10, "git": 5},
+        )
+
+    def test_matches_single_combined_session(self):
+        """Test several sessions give the same analysis as one file with all entries."""
+        paths = self.resumed_sessions()
+        combined = self.write_session(
+            "combined.jsonl",
+            [line for path in paths for line in path.read_text(encoding="utf-8").splitlines()],
+        )
+        split_summary, _ = self.run_pipeline(paths)
+        combined_summary, _ = self.run_pipeline([combined])
+
+        self.assertEqual(split_summary["analysis"], combined_summary["analysis"])
+
+    def test_parallel_matches_sequential(self):
+        """Test worker processes give the same results as loading in-process."""
+        a, b = self.resumed_sessions()
+        c = self.write_session("c.jsonl", session_lines([("toolu_3", "echo hi"), ("toolu_30", "pwd")]))
+        sequential, _ = self.run_pipeline([a, b, c], cpu_count=1)
+        parallel, _ = self.run_pipeline([a, b, c], cpu_count=4)
+
+        self.assertEqual(sequential["analysis"], parallel["analysis"])
+        self.assertEqual(parallel["analysis"]["raw_commands_found"], 26)
+
+    def test_malformed_line_warning_follows_its_session(self):
+        """Test malformed-line warnings print under the session they came from."""
+        a = self.write_session("a.jsonl", session_lines([("toolu_1", "ls")]))
+        b = self.write_session("b.jsonl", session_lines([("toolu_2", "pwd")]) + ["{bad json"])
+        c = self.write_session("c.jsonl", session_lines([("toolu_3", "whoami")]))
+        _, log = self.run_pipeline([a, b, c], cpu_count=4)
+
+        lines = log.splitlines()
+        warning = next(i for i, line in enumerate(lines) if line.startswith("Warning: Skipping malformed JSON"))
+        self.assertIn("at line 3", lines[warning])
+        self.assertTrue(lines[warning - 1].startswith("Loading: b.jsonl"))
+        self.assertTrue(lines[warning + 1].startswith("  -> Loaded 2 entries"))
+
+
+def reference_split(cmd_str):
+    """Character-by-character quote-aware splitter the regex version replaced."""
+    sub_commands = []
+    current = []
+    in_single = in_double = False
+    i = 0
+    while i < len(cmd_str):
+        c = cmd_str[i]
+        if c == "'" and not in_double:
+            in_single = not in_single
+        elif c == '"' and not in_single:
+            in_double = not in_double
+        elif not in_single and not in_double and c in "&|;":
+            width = 2 if cmd_str.startswith(("&&", "||"), i) else 1
+            if width == 2 or c != "&":
+                cmd = "".join(current).strip()
+                if cmd:
+                    sub_commands.append(cmd)
+                current = []
+                i += width
+                continue
+        current.append(c)
+        i += 1
+    cmd = "".join(current).strip()
+    if cmd:
+        sub_commands.append(cmd)
+    return sub_commands
+
+
+class TestExtractSubCommands(unittest.TestCase):
+    """Test splitting compound commands outside quotes."""
+
+    def test_single_command(self):
+        """Test a command without separators is returned whole."""
+        self.assertEqual(main.extract_sub_commands("  ls -la  "), ["ls -la"])
+
+    def test_empty_input(self):
+        """Test empty and blank commands give no sub-commands."""
+        self.assertEqual(main.extract_sub_commands(""), [])
+        self.assertEqual(main.extract_sub_commands("   "), [])
+
+    def test_separators(self):
+        """Test ||, &&, ; and | all split."""
+        self.assertEqual(
+            main.extract_sub_commands("a || b && c ; d | e"),
+            ["a", "b", "c", "d", "e"],
+        )
+        self.assertEqual(main.extract_sub_commands("a&&b||c;d|e"), ["a", "b", "c", "d", "e"])
+
+    def test_single_ampersand_does_not_split(self):
+        """Test a lone & (background, &>, 2>&1) is kept in the segment."""
+        self.assertEqual(main.extract_sub_commands("make 2>&1 | tee log"), ["make 2>&1", "tee log"])
+        self.assertEqual(main.extract_sub_commands("sleep 1 & wait"), ["sleep 1 & wait"])
+
+    def test_empty_segments_dropped(self):
+        """Test separators with nothing between them give no empty sub-commands."""
+        self.assertEqual(main.extract_sub_commands(";; a ;; b ;"), ["a", "b"])
+        self.assertEqual(main.extract_sub_commands("|| ls"), ["ls"])
+        self.assertEqual(main.extract_sub_commands("; && ||"), [])
+
+    def test_single_quotes(self):
+        """Test separators inside single quotes do not split."""
+        self.assertEqual(
+            main.extract_sub_commands("echo 'a;b|c && d' && ls"),
+            ["echo 'a;b|c && d'", "ls"],
+        )
+
+    def test_double_quotes(self):
+        """Test separators inside double quotes do not split."""
+        self.assertEqual(
+            main.extract_sub_commands('grep "a|b" file | wc -l'),
+            ['grep "a|b" file', "wc -l"],
+        )
+
+    def test_nested_quote_characters(self):
+        """Test a quote character inside the other kind of quotes is literal."""
+        self.assertEqual(
+            main.extract_sub_commands("""echo "it's; fine" ; echo 'say "hi; there"' | cat"""),
+            ['echo "it\'s; fine"', """echo 'say "hi; there"'""", "cat"],
+        )
+
+    def test_unterminated_quote(self):
+        """Test an unterminated quote runs to the end of the command."""
+        self.assertEqual(
+            main.extract_sub_commands("ls && echo 'oops; rm x | y"),
+            ["ls", "echo 'oops; rm x | y"],
+        )
+        self.assertEqual(main.extract_sub_commands('echo "a && b'), ['echo "a && b'])
+
+    def test_inline_script_not_split(self):
+        """Test interpreter -c/-e scripts are returned whole."""
+        for cmd in [
+            'python -c "import sys; print(sys.argv)"',
+            "python3 -c 'a = 1; print(a)'",
+            "bash -c 'ls | wc -l && echo done'",
+            'node -e "let a = 1; console.log(a)"',
+            "sh -c\necho a; echo b",
+        ]:
+            self.assertEqual(main.extract_sub_commands(cmd), [cmd])
+
+    def test_inline_script_only_for_interpreter_first(self):
+        """Test the -c early return only applies when an interpreter runs first."""
+        self.assertEqual(
+            main.extract_sub_commands('echo x; python -c "a; b"'),
+            ["echo x", 'python -c "a; b"'],
+        )
+        self.assertEqual(main.extract_sub_commands("grep -c 'x' f; ls"), ["grep -c 'x' f", "ls"])
+
+    def test_matches_reference_splitter(self):
+        """Test random commands split like the character-by-character splitter."""
+        rng = random.Random(0)
+        alphabet = ["a", "b", " ", "'", '"', "|", "||", "&", "&&", ";", "x y", "\\"]
+        for _ in range(5000):
+            cmd = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 16)))
+            if cmd.strip() and cmd.split(None, 1)[0] in ("python", "bash"):
+                continue
+            self.assertEqual(main.extract_sub_commands(cmd), reference_split(cmd), cmd)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
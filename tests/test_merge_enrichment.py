@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Tests for the enrichment merge script.
+
+Tests that enrichment fields, extra flags and improved descriptions are
+written into a COMMAND_DB source file at the right places.
+"""
+
+import unittest
+import ast
+import contextlib
+import io
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+# Add the scripts directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+import merge_enrichment
+
+
+# A miniature knowledge_base.py. Non-ASCII text sits before edit points on
+# the same line, where ast column offsets (UTF-8 bytes) and string indexes
+# (characters) disagree. Like knowledge_base.py, every dict item ends with a
+# comma, which the inserted text relies on.
+FIXTURE_KB = '''"""Miniature knowledge base — fixture for the merge tests."""
+
+from typing import Any, Dict
+
+COMMAND_DB: Dict[str, Dict[str, Any]] = {
+    "ls": {
+        "description": "List directory contents — über-useful ✓",
+        "flags": {
+            "-l": "Long format ✓",
+        },
+    },
+    "cat": {
+        "description": "Concaténate — files",
+        "flags": {"-n": "Number lines №", "-E": "Mark line ends with $ — visibly",},
+    },
+}
+
+OPERATORS: Dict[str, Dict[str, str]] = {
+    "|": {"name": "Pipe"},
+}
+'''
+
+
+class MergeTestCase(unittest.TestCase):
+    """Base class writing the fixture knowledge base to a temp file."""
+
+    fixture = FIXTURE_KB
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.kb_path = Path(self.tmp.name) / "knowledge_base.py"
+        self.kb_path.write_text(self.fixture, encoding="utf-8")
+
+    def merge(self, enrichments):
+        """Merge enrichments into the fixture; return (count, new source)."""
+        with contextlib.redirect_stdout(io.StringIO()):
+            count = merge_enrichment.merge_into_knowledge_base(self.kb_path, enrichments)
+        return count, self.kb_path.read_text(encoding="utf-8")
+
+    def load_db(self, source):
+        """Execute merged source and return its COMMAND_DB."""
+        namespace = {}
+        exec(compile(source, str(self.kb_path), "exec"), namespace)
+        return namespace["COMMAND_DB"]
+
+
+class TestMergeIntoKnowledgeBase(MergeTestCase):
+    """Test the AST-offset based merge."""
+
+    def test_inserts_missing_fields(self):
+        """Test missing fields are inserted before the entry's closing brace."""
+        count, source = self.merge({
+            "ls": {
+                "man_url": "https://man7.org/linux/man-pages/man1/ls.1.html",
+                "use_cases": ["See what is here", "Check hidden files"],
+                "difficulty": "beginner",
+            },
+        })
+        db = self.load_db(source)
+
+        self.assertEqual(count, 1)
+        self.assertEqual(db["ls"]["man_url"], "https://man7.org/linux/man-pages/man1/ls.1.html")
+        self.assertEqual(db["ls"]["use_cases"], ["See what is here", "Check hidden files"])
+        self.assertEqual(db["ls"]["difficulty"], "beginner")
+        self.assertEqual(db["ls"]["flags"], {"-l": "Long format ✓"})
+        # New fields go right before the closing brace, after its indent;
+        # the merge has always left that indent on a line of its own
+        self.assertIn(
+            '            "-l": "Long format ✓",\n'
+            '        },\n'
+            '    \n'
+            '        "man_url": "https://man7.org/linux/man-pages/man1/ls.1.html",\n'
+            '        "use_cases": ["See what is here", "Check hidden files"],\n'
+            '        "difficulty": "beginner",\n'
+            '    },\n'
+            '    "cat": {',
+            source,
+        )
+
+    def test_inserts_flags(self):
+        """Test extra flags are appended to the entry's flags dict."""
+        _, source = self.merge({"ls": {"extra_flags": {"-a": "Show hidden", "-h": "Human sizes"}}})
+        db = self.load_db(source)
+
+        self.assertEqual(
+            db["ls"]["flags"],
+            {"-l": "Long format ✓", "-a": "Show hidden", "-h": "Human sizes"},
+        )
+        self.assertEqual(list(db), ["ls", "cat"])
+
+    def test_replaces_description(self):
+        """Test an improved description replaces the existing string in place."""
+        _, source = self.merge({"ls": {"improved_description": "List files — the \"basics\""}})
+        db = self.load_db(source)
+
+        self.assertEqual(db["ls"]["description"], "List files — the \"basics\"")
+        self.assertEqual(
+            source,
+            FIXTURE_KB.replace(
+                '"List directory contents — über-useful ✓"',
+                '"List files — the \\"basics\\""',
+            ),
+        )
+
+    def test_non_ascii_before_edit_points(self):
+        """Test edits land correctly after multi-byte characters on the same line."""
+        _, source = self.merge({
+            "cat": {
+                "improved_description": "Concatenate and print files",
+                "extra_flags": {"-A": "Show all"},
+                "difficulty": "beginner",
+            },
+        })
+        db = self.load_db(source)
+
+        self.assertEqual(db["cat"], {
+            "description": "Concatenate and print files",
+            "flags": {"-n": "Number lines №", "-E": "Mark line ends with $ — visibly", "-A": "Show all"},
+            "difficulty": "beginner",
+        })
+        self.assertEqual(db["ls"]["description"], "List directory contents — über-useful ✓")
+
+    def test_result_still_parses(self):
+        """Test the merged file is valid Python and other tables are untouched."""
+        _, source = self.merge({
+            "ls": {"gotchas": ["Parsing ls output is fragile"], "extra_flags": {"-R": "Recurse"}},
+            "cat": {"related": ["less", "tac"]},
+        })
+        tree = ast.parse(source)
+        namespace = {}
+        exec(compile(tree, str(self.kb_path), "exec"), namespace)
+
+        self.assertEqual(namespace["OPERATORS"], {"|": {"name": "Pipe"}})
+        self.assertEqual(namespace["COMMAND_DB"]["cat"]["related"], ["less", "tac"])
+        self.assertEqual(namespace["COMMAND_DB"]["ls"]["gotchas"], ["Parsing ls output is fragile"])
+
+    def test_unknown_command_skipped(self):
+        """Test enrichments for commands missing from COMMAND_DB change nothing."""
+        count, source = self.merge({"nosuchcmd": {"difficulty": "advanced"}})
+
+        self.assertEqual(count, 0)
+        self.assertEqual(source, FIXTURE_KB)
+
+
+class TestCollectedEdits(MergeTestCase):
+    """Test edits collected as spans of the original source and applied together."""
+
+    def test_several_edits_in_one_entry(self):
+        """Test a description, flags and fields edit in the same entry all apply."""
+        count, source = self.merge({
+            "ls": {
+                "improved_description": "List files",
+                "extra_flags": {"-a": "Show hidden"},
+                "related": ["tree", "find"],
+            },
+        })
+
+        self.assertEqual(count, 1)
+        self.assertEqual(
+            source,
+            FIXTURE_KB.replace(
+                '        "description": "List directory contents — über-useful ✓",\n'
+                '        "flags": {\n'
+                '            "-l": "Long format ✓",\n'
+                '        },\n'
+                '    },\n',
+                '        "description": "List files",\n'
+                '        "flags": {\n'
+                '            "-l": "Long format ✓",\n'
+                '        \n'
+                '            "-a": "Show hidden",\n'
+                '        },\n'
+                '    \n'
+                '        "related": ["tree", "find"],\n'
+                '    },\n',
+            ),
+        )
+
+    def test_edits_collected_in_reverse_order(self):
+        """Test edits collected later in the file first are applied in file order."""
+        forward = {
+            "ls": {"improved_description": "List files", "difficulty": "beginner"},
+            "cat": {"improved_description": "Print files", "extra_flags": {"-s": "Squeeze blanks"}},
+        }
+        _, forward_source = self.merge(forward)
+        self.kb_path.write_text(FIXTURE_KB, encoding="utf-8")
+        _, reverse_source = self.merge(dict(reversed(list(forward.items()))))
+
+        self.assertEqual(reverse_source, forward_source)
+        db = self.load_db(reverse_source)
+        self.assertEqual(db["ls"]["description"], "List files")
+        self.assertEqual(db["ls"]["difficulty"], "beginner")
+        self.assertEqual(db["cat"]["description"], "Print files")
+        self.assertEqual(db["cat"]["flags"]["-s"], "Squeeze blanks")
+
+    def test_no_edits_leaves_file_untouched(self):
+        """Test a merge with nothing to change keeps the file byte-identical and unwritten."""
+        os.utime(self.kb_path, ns=(0, 0))
+        before = self.kb_path.read_bytes()
+
+        count, _ = self.merge({
+            "ls": {"extra_flags": {"-l": "Long format"}, "improved_description": ""},
+            "cat": {"use_cases": []},
+        })
+
+        self.assertEqual(count, 0)
+        self.assertEqual(self.kb_path.read_bytes(), before)
+        self.assertEqual(self.kb_path.stat().st_mtime_ns, 0)
+
+
+# An entry whose subcommands sit next to its flags, as git's does
+FIXTURE_KB_SUBCOMMANDS = '''COMMAND_DB = {
+    "git": {
+        "description": "Version control",
+        "man_url": "https://git-scm.com/docs",
+        "flags": {
+            "-C": "Run as if started in path",
+        },
+        "subcommands": {
+            "stash": "Stash changes",
+            "status": "Show working tree status",
+        },
+    },
+}
+'''
+
+
+class TestExistingKeys(MergeTestCase):
+    """Test names already present in an entry are never added again."""
+
+    fixture = FIXTURE_KB_SUBCOMMANDS
+
+    def test_existing_field_skipped(self):
+        """Test a field the entry already has keeps its value."""
+        count, source = self.merge({
+            "git": {"man_url": "https://example.com/git", "difficulty": "intermediate"},
+        })
+        db = self.load_db(source)
+
+        self.assertEqual(count, 1)
+        self.assertEqual(db["git"]["man_url"], "https://git-scm.com/docs")
+        self.assertEqual(db["git"]["difficulty"], "intermediate")
+        self.assertEqual(source.count('"man_url"'), 1)
+
+    def test_existing_flag_skipped(self):
+        """Test an extra flag already in the flags dict is not duplicated."""
+        _, source = self.merge({
+            "git": {"extra_flags": {"-C": "Change directory first", "-p": "Paginate output"}},
+        })
+        db = self.load_db(source)
+
+        self.assertEqual(source.count('"-C"'), 1)
+        self.assertEqual(
+            db["git"]["flags"],
+            {"-C": "Run as if started in path", "-p": "Paginate output"},
+        )
+
+    def test_subcommand_modeled_as_flag_skipped(self):
+        """Test an extra 'flag' that is already a subcommand is not added to flags."""
+        _, source = self.merge({
+            "git": {"extra_flags": {"stash": "Stash changes away", "--bare": "Bare repository"}},
+        })
+        db = self.load_db(source)
+
+        self.assertEqual(source.count('"stash"'), 1)
+        self.assertEqual(
+            db["git"]["flags"],
+            {"-C": "Run as if started in path", "--bare": "Bare repository"},
+        )
+        self.assertEqual(db["git"]["subcommands"]["stash"], "Stash changes")
+
+    def test_nothing_new_leaves_file_untouched(self):
+        """Test enrichments naming only existing keys change nothing."""
+        count, source = self.merge({
+            "git": {"man_url": "https://example.com/git", "extra_flags": {"-C": "x", "status": "y"}},
+        })
+
+        self.assertEqual(count, 0)
+        self.assertEqual(source, FIXTURE_KB_SUBCOMMANDS)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)